@@ -1,11 +1,46 @@
+import os
+import copy
+import pickle
 from DataScraping import DataScraping
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+import Metrics
+from EventLog import EventLog, DEBUG
+from Ledger import Ledger, NOTHING, BUY, SELL, ACTION_LABELS
+import Orders
+
+CHECKPOINT_VERSION = 3
+DATASET_REFERENCE = "dataScraper"
+
+
+class CheckpointPickler(pickle.Pickler):
+    """Pickles the run's dataset as a reference wherever it is held, so it is never written out"""
+
+    def __init__(self, file, dataScraper):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.dataScraper = dataScraper
+
+    def persistent_id(self, obj):
+        return DATASET_REFERENCE if obj is self.dataScraper else None
+
+
+class CheckpointUnpickler(pickle.Unpickler):
+    """Points every dataset reference in a checkpoint at the given dataScraper"""
+
+    def __init__(self, file, dataScraper):
+        super().__init__(file)
+        self.dataScraper = dataScraper
+
+    def persistent_load(self, pid):
+        if pid != DATASET_REFERENCE:
+            raise pickle.UnpicklingError(f"Unknown reference {pid!r} in checkpoint")
+        return self.dataScraper
 
 
 class BackTesting:
-    def __init__(self, strategy, amount, dataScraper, transactionCost, date, buyAmount, extraCosts, drawDown, drawUp):
+    def __init__(self, strategy, amount, dataScraper, transactionCost, date, buyAmount, extraCosts, drawDown, drawUp,
+                 log=None, intrabarPath="OHLC", costModel=None, ledgerPath=None):
         self.initialAmount = amount
         self.stocks = 0
         self.dataScraper = dataScraper
@@ -13,18 +48,26 @@ class BackTesting:
         self.cash = amount
         self.transactionCost = transactionCost
         self.date = date
-        self.portfolio = []
-        self.i = 0
-        self.listBuy = []
-        self.closePrice = []
-        self.numStocks = []
-        self.numCash = []
+        self.i = NOTHING
+        # Sized to the dataset up front; one row per update() call. With ledgerPath the rows live in a
+        # memory-mapped file, so a long streamed run's memory doesn't grow with the bar count
+        self.ledger = Ledger(dataScraper.sizeHint(), path=ledgerPath)
+        self.time = pd.Timestamp(date).value
         self.buyAmount = buyAmount
         self.extraCosts = extraCosts
         self.initialBuyAmount = buyAmount
         self.drawDown = drawDown
         self.drawUp = drawUp
         self.buyHold = []
+        # Per-bar lines are DEBUG; pass EventLog.quiet() in batch runs to only record trade/stop events
+        self.log = log if log is not None else EventLog(level=DEBUG)
+        # Limit/stop orders from strategies with buyOrder()/sellOrder(), filled from later bars' OHLC
+        self.orders = Orders.RestingOrders(path=intrabarPath)
+        # Slippage/impact from CostModels, precomputed for every row and charged on top of extraCosts
+        self.costModel = costModel
+        self.costs = costModel.prepare(dataScraper.data) if costModel is not None else None
+        self.row = None
+        self.nextRow = None
 
     def checkCash(self, amount):
         return self.cash >= amount
@@ -32,66 +75,228 @@ class BackTesting:
 
         price = self.dataScraper.getDateData(self.date, self.strategy.getType())
         if self.strategy.buy() and self.cash > self.buyAmount + self.extraCosts*self.buyAmount:
-            print("                                               TRUE BUY")
-            self.i = 1
+            order = self.strategy.buyOrder() if hasattr(self.strategy, "buyOrder") else None
+            if order is not None:
+                self.postOrder(Orders.BUY, order, float(price))
+                return
+            self.i = BUY
             self.cash -= self.buyAmount + self.extraCosts * self.buyAmount
-            self.stocks += self.buyAmount/(float(self.dataScraper.getDateData(self.date, self.strategy.getType())))
+            bought = self.buyAmount/(float(self.dataScraper.getDateData(self.date, self.strategy.getType())))
+            self.cash -= self.modelCost(bought, float(price))
+            self.stocks += bought
+            self.ledger.fill(self.time, BUY, float(price), bought, self.cash)
+            self.log.info("buy", self.date, price=float(price), shares=self.stocks, cash=self.cash)
     def sell(self):
         if(self.strategy.sell() and self.stocks > 0):
-            print("                                               TRUE SELL")
-            self.i = 2
-            self.cash += float(self.dataScraper.getDateData(self.date, self.strategy.getType())) * self.stocks - self.extraCosts * float(self.dataScraper.getDateData(self.date, self.strategy.getType()))
+            order = self.strategy.sellOrder() if hasattr(self.strategy, "sellOrder") else None
+            if order is not None:
+                self.postOrder(Orders.SELL, order, None)
+                return
+            self.i = SELL
+            price = float(self.dataScraper.getDateData(self.date, self.strategy.getType()))
+            self.cash += price * self.stocks - self.extraCosts * price - self.modelCost(self.stocks, price)
+            self.ledger.fill(self.time, SELL, price, self.stocks, self.cash)
+            self.log.info("sell", self.date, price=price, shares=self.stocks, cash=self.cash)
             self.stocks = 0
 
     def sellA(self):
-        print("                                               TRUE SELL")
-        self.i = 2
-        self.cash += float(self.dataScraper.getDateData(self.date, self.strategy.getType())) * self.stocks - self.extraCosts * float(self.dataScraper.getDateData(self.date, self.strategy.getType()))
+        self.i = SELL
+        self.orders.cancel(side=Orders.SELL)
+        price = float(self.dataScraper.getDateData(self.date, self.strategy.getType()))
+        self.cash += price * self.stocks - self.extraCosts * price - self.modelCost(self.stocks, price)
+        if self.stocks > 0:
+            self.ledger.fill(self.time, SELL, price, self.stocks, self.cash, stop=True)
+        self.log.info("sell", self.date, price=price, shares=self.stocks, cash=self.cash)
         self.stocks = 0
 
+    def modelCost(self, shares, price):
+        if self.costs is None or shares == 0:
+            return 0.0
+        return float(self.costs.cost(self.row, shares, price))
+
+    def postOrder(self, side, order, price):
+        """
+        Rest an order from the strategy instead of filling at this bar's close
+
+        order: {"kind": "limit" | "stop" | "stop_limit" | "market", "limit": ..., "stop": ..., "goodFor": bars}
+        """
+        # A new order replaces whatever was resting on the same side, so pegged quotes follow the market
+        self.orders.cancel(side=side)
+        limit = order.get("limit", np.nan)
+        stop = order.get("stop", np.nan)
+        if side == Orders.BUY:
+            reference = limit if not np.isnan(limit) else (stop if not np.isnan(stop) else price)
+            quantity = self.buyAmount / reference
+        else:
+            quantity = self.stocks
+        expiry = self.ledger.count + order.get("goodFor", 1)
+        orderId = self.orders.submit(side, quantity, order.get("kind", "limit"), limit, stop, expiry)
+        self.log.info("order", self.date, id=orderId, side="buy" if side == Orders.BUY else "sell",
+                      kind=order.get("kind", "limit"), limit=limit, stop=stop, quantity=quantity)
+
+    def fillOrders(self):
+        """Match resting orders against the current bar's Open/High/Low/Close"""
+        if self.orders.pending() == 0:
+            return
+        o, h, l, c = (float(self.dataScraper.getDateData(self.date, col)) for col in ("Open", "High", "Low", "Close"))
+        for fill in self.orders.match(o, h, l, c, self.ledger.count):
+            price = float(fill["price"])
+            if fill["side"] == Orders.BUY:
+                # Never spend more than the cash on hand, even if the fill price is worse than the reference
+                quantity = min(float(fill["quantity"]), self.cash / (price * (1 + self.extraCosts)))
+                if quantity <= 0:
+                    continue
+                self.cash -= quantity * price + self.extraCosts * quantity * price + self.modelCost(quantity, price)
+                self.stocks += quantity
+                self.i = BUY
+                self.ledger.fill(self.time, BUY, price, quantity, self.cash)
+                self.log.info("buy", self.date, price=price, shares=self.stocks, cash=self.cash, order=int(fill["id"]))
+            else:
+                quantity = min(float(fill["quantity"]), self.stocks)
+                if quantity <= 0:
+                    continue
+                self.cash += price * quantity - self.extraCosts * quantity * price - self.modelCost(quantity, price)
+                self.stocks -= quantity
+                self.i = SELL
+                self.ledger.fill(self.time, SELL, price, quantity, self.cash)
+                self.log.info("sell", self.date, price=price, shares=quantity, cash=self.cash, order=int(fill["id"]))
+
     def update(self, date):
         self.buyAmount = .9*self.cash
         self.date = date
+        self.time = pd.Timestamp(date).value
+        if self.costs is not None:
+            self.row = self.dataScraper.getRow(date)
         self.strategy.setDate(date)
+        self.fillOrders()
         self.buy()
         self.sell()
-        print("cash: " + str(self.cash))
-        if not self.portfolio:
+        if self.ledger.count == 0:
             pass
         else:
-            if (self.cash + self.stocks * float(self.dataScraper.getDateData(self.date, self.strategy.getType()))) < ((1-self.drawDown)*(self.portfolio[-1])):
-                print("                                    LOSS")
+            previous = self.ledger.last("equity")
+            if (self.cash + self.stocks * float(self.dataScraper.getDateData(self.date, self.strategy.getType()))) < ((1-self.drawDown)*previous):
+                self.log.info("stop_loss", self.date, portfolio=previous)
                 self.sellA()
-            elif (self.cash + self.stocks * float(self.dataScraper.getDateData(self.date, self.strategy.getType()))) > ((1+self.drawUp)*(self.portfolio[-1])):
-                print("                                     PROFIT")
+            elif (self.cash + self.stocks * float(self.dataScraper.getDateData(self.date, self.strategy.getType()))) > ((1+self.drawUp)*previous):
+                self.log.info("take_profit", self.date, portfolio=previous)
                 self.sellA()
 
-        self.portfolio.append(self.cash + self.stocks * float(self.dataScraper.getDateData(self.date, self.strategy.getType())))
-        print(date)
-        if(self.i == 1):
-            self.listBuy.append("Buy")
-        elif(self.i == 2):
-            self.listBuy.append("Sell")
-        else:
-            self.listBuy.append("Nothing")
-        self.i = 0
-        self.closePrice.append(float(self.dataScraper.getDateData(self.date, self.strategy.getType())))
-        self.numStocks.append(self.stocks)
-        self.numCash.append(self.cash)
-
+        price = float(self.dataScraper.getDateData(self.date, self.strategy.getType()))
+        self.ledger.record(self.time, self.i, price, self.cash, self.stocks, self.cash + self.stocks * price)
+        self.log.debug("bar", date, cash=self.cash)
+        self.i = NOTHING
+
+
+    def run(self, start=1, end=None, checkpointPath=None, checkpointEvery=10000):
+        """
+        Step through rows start..end-1 of the dataset, stopping early on bankruptcy
+
+        With checkpointPath set, engine and strategy state are saved every checkpointEvery bars
+        and at the end; pick a run back up with BackTesting.resume(checkpointPath, dataScraper)
+        """
+        row = start
+        # Without an end, ask the dataset; streaming datasets only know their length once exhausted
+        while (row < end if end is not None else self.dataScraper.hasRow(row)) and not self.bankrupt():
+            self.update(self.dataScraper.getIndex(row))
+            row += 1
+            if checkpointPath is not None and (row - start) % checkpointEvery == 0:
+                self.saveCheckpoint(checkpointPath, row)
+        if checkpointPath is not None:
+            self.saveCheckpoint(checkpointPath, row)
+        self.nextRow = row
+        self.log.flush()
+        return self.portfolio
+
+    def catchUp(self, start=1):
+        """
+        Process only the bars appended to a LiveDataScraping since the last run()/catchUp()
+
+        The first call starts at start. Returns the number of bars processed. Cost models are
+        precomputed over the whole dataset, so with one set they are re-prepared here, which
+        costs a pass over the data per call.
+        """
+        row = getattr(self, "nextRow", None)
+        row = start if row is None else row
+        if not self.dataScraper.hasRow(row):
+            return 0
+        if getattr(self, "costModel", None) is not None:
+            self.costs = self.costModel.prepare(self.dataScraper.data)
+        self.run(row)
+        return self.nextRow - row
+
+    def _datasetKey(self):
+        return self.dataScraper.datasetKey()
+
+    def saveCheckpoint(self, path, nextRow):
+        """Atomically write engine + strategy state; the dataset itself is not stored"""
+        self.log.flush()
+        engine = {k: v for k, v in self.__dict__.items() if k not in ("dataScraper", "strategy", "log")}
+        # Strategies are pickled whole (position, quantum_memory, consecutive_losses, fitted models...);
+        # the pickler swaps the dataset for a reference, including inside composite strategies
+        log = copy.copy(self.log)
+        log.stream = None
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "nextRow": nextRow,
+            "dataset": self._datasetKey(),
+            "engine": engine,
+            "strategy": self.strategy,
+            "log": log,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            CheckpointPickler(f, self.dataScraper).dump(payload)
+        os.replace(tmp, path)
+
+    @classmethod
+    def resume(cls, path, dataScraper, log=None):
+        """Rebuild a run from a checkpoint; returns (backTesting, nextRow) to continue with run(nextRow)"""
+        with open(path, "rb") as f:
+            payload = CheckpointUnpickler(f, dataScraper).load()
+        if payload.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {payload.get('version')}")
+        backTesting = cls.__new__(cls)
+        backTesting.__dict__.update(payload["engine"])
+        backTesting.dataScraper = dataScraper
+        backTesting.strategy = payload["strategy"]
+        backTesting.log = log if log is not None else payload["log"]
+        backTesting.nextRow = payload["nextRow"]
+        if backTesting._datasetKey() != payload["dataset"]:
+            raise ValueError("Checkpoint was written for a different dataset")
+        return backTesting, payload["nextRow"]
+
+    # Views over the ledger under the names the per-bar lists used to have
+    @property
+    def portfolio(self):
+        return self.ledger.bars["equity"]
+
+    @property
+    def listBuy(self):
+        return ACTION_LABELS[self.ledger.bars["action"]]
+
+    @property
+    def closePrice(self):
+        return self.ledger.bars["price"]
+
+    @property
+    def numStocks(self):
+        return self.ledger.bars["shares"]
+
+    @property
+    def numCash(self):
+        return self.ledger.bars["cash"]
 
     def bankrupt(self):
         return self.cash <= 0
 
     def displayData(self):
+        self.log.flush()
         pd.set_option('display.max_rows', None)
-        index_list = list(self.dataScraper.data.index)
-        combined_list = list(zip(index_list, self.portfolio))
-        df = pd.DataFrame(combined_list, columns=['Date', 'Portfolio'])
-        df['Action'] = self.listBuy
-        df['Price'] = self.closePrice
-        df['Num Prices'] = self.numStocks
-        df['Cash'] = self.numCash
+        df = self.ledger.toFrame(pd.Timestamp(self.date).tz)
+        df = df.rename(columns={'equity': 'Portfolio', 'action': 'Action', 'price': 'Price',
+                                'shares': 'Num Prices', 'cash': 'Cash'})
+        df = df[['Date', 'Portfolio', 'Action', 'Price', 'Num Prices', 'Cash']]
 
         first_price = df['Price'].iloc[0]
         factor = self.initialAmount/first_price
@@ -100,35 +305,22 @@ class BackTesting:
 
         print(df)
 
-        portfolio_series = pd.Series(self.portfolio)
-
-        daily_returns = portfolio_series.pct_change().dropna()
-
-        avg_daily_return = daily_returns.mean()
-
-        annualized_return = avg_daily_return * 252
-
-        daily_volatility = daily_returns.std()
-
-        annualized_volatility = daily_volatility * np.sqrt(252)
-
+        metrics = Metrics.summary(df['Portfolio'].values, index=df['Date'], shares=df['Num Prices'].values,
+                                  prices=df['Price'].values)
 
         buyAndHoldReturns = df["Buy and Hold"].iloc[-1] / df["Buy and Hold"].iloc[0] - 1
 
-        if annualized_volatility != 0:
-            sharpe_ratio = annualized_return / annualized_volatility
-        else:
-            sharpe_ratio = np.nan
-
-
-
         # Print summary
         print("==== Strategy Performance Summary ====")
         print("Profits $" + str(self.portfolio[-1] - self.portfolio[0]))
-        print(f"Total Return: {portfolio_series.iloc[-1] / portfolio_series.iloc[0] - 1:.2%}")
-        print(f"Annualized Return: {annualized_return:.2%}")
-        print(f"Annualized Volatility: {annualized_volatility:.2%}")
-        print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
+        print(f"Total Return: {metrics['totalReturn']:.2%}")
+        print(f"Annualized Return: {metrics['annualReturn']:.2%}")
+        print(f"Annualized Volatility: {metrics['annualVolatility']:.2%}")
+        print(f"Sharpe Ratio: {metrics['sharpe']:.2f}")
+        print(f"Sortino Ratio: {metrics['sortino']:.2f}")
+        print(f"Max Drawdown: {metrics['maxDrawdown']:.2%} over {metrics['drawdownDuration']:.0f} bars")
+        print(f"Calmar Ratio: {metrics['calmar']:.2f}")
+        print(f"Exposure: {metrics['exposure']:.2%}   Hit Rate: {metrics['hitRate']:.2%}   Turnover: {metrics['turnover']:.2f}x")
         print("=====================================")
 
 
@@ -136,10 +328,11 @@ class BackTesting:
         plt.figure(figsize=(10, 6))
         textstr = '\n'.join((
             f'Profits: ${self.portfolio[-1] - self.portfolio[0]:.2f}',
-            f'Total Return: {portfolio_series.iloc[-1] / portfolio_series.iloc[0] - 1:.2%}',
-            f'Annualized Return: {annualized_return:.2%}',
-            f'Annualized Volatility: {annualized_volatility:.2%}',
-            f'Sharpe Ratio: {sharpe_ratio:.2f}',
+            f'Total Return: {metrics["totalReturn"]:.2%}',
+            f'Annualized Return: {metrics["annualReturn"]:.2%}',
+            f'Annualized Volatility: {metrics["annualVolatility"]:.2%}',
+            f'Sharpe Ratio: {metrics["sharpe"]:.2f}',
+            f'Max Drawdown: {metrics["maxDrawdown"]:.2%}',
             f'Buy and Hold vs Strategy: {buyAndHoldReturns:.2%}'
         ))
 
@@ -152,7 +345,6 @@ class BackTesting:
             bbox=dict(boxstyle='round', facecolor='white', alpha=0.8)
         )
 
-        listC = [self.initialAmount] + self.portfolio
         plt.plot(df["Date"].tolist(), df['Portfolio'].tolist())
         plt.plot(df["Date"].tolist(), df['Buy and Hold'].tolist())
 
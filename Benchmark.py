@@ -0,0 +1,208 @@
+import gc
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from BackTesting import BackTesting
+from DataScraping import DataScraping
+from EventLog import EventLog
+import Strategies
+import SyntheticData
+
+SIZES = (1000, 10000, 100000, 1000000)
+
+
+class _Timed:
+    """Wraps a bound strategy method, adding each call's duration to a shared counter"""
+
+    def __init__(self, method, clock):
+        self.method = method
+        self.clock = clock
+
+    def __call__(self):
+        begin = time.perf_counter_ns()
+        try:
+            return self.method()
+        finally:
+            self.clock[0] += time.perf_counter_ns() - begin
+
+
+def _instrument(strategy):
+    clock = [0]
+    strategy.buy = _Timed(strategy.buy, clock)
+    strategy.sell = _Timed(strategy.sell, clock)
+    return clock
+
+
+def _backTesting(strategyClass, dataScraper, amount):
+    date = dataScraper.getIndex(1)
+    strategy = strategyClass(dataScraper, date)
+    return BackTesting(strategy, amount, dataScraper, 0, date, .9 * amount, 0, .02, .50, EventLog.quiet())
+
+
+def measure(strategyClass, data, timeBudget=60.0, memory=True, amount=1000):
+    """
+    Time one strategy bar by bar over data
+
+    Latency is buy() + sell() per bar; total time covers the whole update() loop. A run that
+    exceeds timeBudget seconds stops there and reports the bars it got through. Peak memory
+    comes from a second, tracemalloc-instrumented pass over the same bars, so tracing
+    overhead never lands in the latency numbers.
+    """
+    dataScraper = DataScraping.fromData(data)
+    backTesting = _backTesting(strategyClass, dataScraper, amount)
+    clock = _instrument(backTesting.strategy)
+    latencies = np.zeros(len(data))
+    gc.collect()
+    begin = time.perf_counter()
+    deadline = begin + timeBudget
+    row = 1
+    while row < len(data) and not backTesting.bankrupt():
+        clock[0] = 0
+        backTesting.update(dataScraper.getIndex(row))
+        latencies[row] = clock[0]
+        row += 1
+        if time.perf_counter() > deadline:
+            break
+    total = time.perf_counter() - begin
+    latencies = latencies[1:row] / 1e3
+
+    result = {
+        "strategy": strategyClass.__name__,
+        "bars": len(data),
+        "completed": row - 1,
+        "truncated": row < len(data) and not backTesting.bankrupt(),
+        "meanUs": float(latencies.mean()) if len(latencies) else None,
+        "p50Us": float(np.percentile(latencies, 50)) if len(latencies) else None,
+        "p99Us": float(np.percentile(latencies, 99)) if len(latencies) else None,
+        "totalSeconds": total,
+        "peakMB": None,
+    }
+    if memory:
+        backTesting = _backTesting(strategyClass, dataScraper, amount)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            backTesting.run(1, row)
+            result["peakMB"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def scalingExponent(results):
+    """
+    Slope of log(mean per-bar latency) against log(bars)
+
+    About 0 means constant work per bar; about 1 means each bar rescans the history (quadratic runs).
+    Truncated runs only saw their first bars, so they are left out.
+    """
+    points = [(r["bars"], r["meanUs"]) for r in results if r.get("meanUs") and not r["truncated"]]
+    if len(points) < 2:
+        return None
+    bars, latency = np.log(np.array(points, dtype=np.float64)).T
+    return float(np.polyfit(bars, latency, 1)[0])
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(strategyClasses=None, sizes=SIZES, seed=0, timeBudget=60.0, memory=True, path=None, skipped=None):
+    """
+    Benchmark every strategy at every dataset size, optionally writing the results to a JSON file
+
+    A strategy that hits the time budget at one size is not run at the larger ones. skipped is
+    the {name: error} map from Strategies.load() when the caller loaded the classes itself.
+    """
+    skipped = dict(skipped or {})
+    if strategyClasses is None:
+        strategyClasses, skipped = Strategies.load()
+    report = {
+        "commit": _commit(),
+        "created": pd.Timestamp.now(tz="UTC").isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "sizes": list(sizes),
+        "seed": seed,
+        "timeBudget": timeBudget,
+        "skipped": {name: str(error) for name, error in skipped.items()},
+        "results": [],
+        "scaling": {},
+    }
+    datasets = {bars: SyntheticData.generate(bars, seed) for bars in sizes}
+    for strategyClass in strategyClasses:
+        own = []
+        for bars in sizes:
+            print(f"{strategyClass.__name__}: {bars} bars")
+            try:
+                result = measure(strategyClass, datasets[bars], timeBudget, memory)
+            except Exception as e:
+                own.append({"strategy": strategyClass.__name__, "bars": bars, "error": f"{type(e).__name__}: {e}"})
+                break
+            own.append(result)
+            if result["truncated"]:
+                break
+        report["results"].extend(own)
+        report["scaling"][strategyClass.__name__] = scalingExponent(own)
+    if path is not None:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def compare(baseline, current, threshold=.2):
+    """
+    Side-by-side of two benchmark reports (dicts or JSON paths) on mean/p99 latency and peak memory
+
+    regression is set where any of them grew by more than threshold (0.2 = 20%).
+    """
+    frames = []
+    for report in (baseline, current):
+        if isinstance(report, str):
+            with open(report) as f:
+                report = json.load(f)
+        frames.append(pd.DataFrame(report["results"]).reindex(columns=["strategy", "bars", "meanUs", "p99Us", "peakMB"]))
+    table = frames[0].merge(frames[1], on=["strategy", "bars"], suffixes=("Before", "After"))
+    regression = np.zeros(len(table), dtype=bool)
+    for column in ("meanUs", "p99Us", "peakMB"):
+        ratio = table[column + "After"].astype(float) / table[column + "Before"].astype(float)
+        table[column + "Ratio"] = ratio
+        regression |= (ratio > 1 + threshold).to_numpy()
+    table["regression"] = regression
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-bar latency, run time and memory for BatchTest's strategies")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--strategies", nargs="+", help="Class names to run (default: all of BatchTest's)")
+    parser.add_argument("--budget", type=float, default=60.0, help="Seconds per strategy and size before stopping")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--out", default="benchmark.json")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    classes, skipped = Strategies.load(names=args.strategies)
+    for name, error in skipped.items():
+        print(f"Skipping {name}: {error}")
+    report = run(classes, args.sizes, args.seed, args.budget, not args.no_memory, args.out, skipped)
+    print(pd.DataFrame(report["results"]).to_string(index=False, float_format="%.2f"))
+    print(pd.Series(report["scaling"], name="scaling exponent").to_string())
+    if args.compare:
+        table = compare(args.compare, report)
+        print(table.to_string(index=False, float_format="%.2f"))
+        if table["regression"].any():
+            raise SystemExit(1)
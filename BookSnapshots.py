@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+SIDES = ("bidPrice", "bidSize", "askPrice", "askSize")
+
+
+def snapshotDtype(depth):
+    """One top-of-book snapshot: int64 ns timestamp and depth levels a side, best level first"""
+    return np.dtype([("time", np.int64)] + [(name, np.float64, (depth,)) for name in SIDES])
+
+
+class BookSnapshots:
+    def __init__(self, records):
+        """
+        Top-N order book snapshots in one structured array (see snapshotDtype), sorted by time
+
+        Saved as a plain .npy file, so read() memory-maps it and aligning to bars only pages in
+        the snapshots that are actually used. Missing levels are NaN prices with size 0.
+        """
+        self.records = records
+        self.depth = records.dtype["bidPrice"].shape[0]
+        self.times = records["time"]
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def fromArrays(cls, times, bidPrice, bidSize, askPrice, askSize):
+        """(snapshots,) times and (snapshots, depth) arrays -> BookSnapshots, sorted by time"""
+        bidPrice = np.atleast_2d(bidPrice)
+        records = np.zeros(len(times), dtype=snapshotDtype(bidPrice.shape[1]))
+        records["time"] = times
+        for name, values in zip(SIDES, (bidPrice, bidSize, askPrice, askSize)):
+            records[name] = values
+        if (np.diff(records["time"]) < 0).any():
+            records = records[np.argsort(records["time"], kind="stable")]
+        return cls(records)
+
+    @classmethod
+    def fromMessages(cls, messages, times, depth=10, tickSize=0.01):
+        """Snapshots of an OrderBook replaying L2/L3 messages, taken just before each of times (ns)"""
+        from OrderBook import OrderBook
+
+        book = OrderBook(tickSize)
+        records = np.zeros(len(times), dtype=snapshotDtype(depth))
+        times = np.asarray(times, dtype=np.int64)
+        records["time"] = times
+        # Where the messages before each snapshot end; a snapshot with nothing new copies the last
+        ends = np.searchsorted(messages["time"], times, side="left")
+        columns = [records[name] for name in SIDES]
+        applied = 0
+        for k, end in enumerate(ends):
+            if end == applied and k:
+                for column in columns:
+                    column[k] = column[k - 1]
+                continue
+            applied += book.replay(messages[applied:end])
+            for name, column, values in zip(SIDES, columns, book.top(depth)):
+                column[k, :len(values)] = values
+                column[k, len(values):] = np.nan if name.endswith("Price") else 0.0
+        return cls(records)
+
+    def write(self, path):
+        np.save(path, self.records)
+
+    @classmethod
+    def read(cls, path):
+        return cls(np.load(path, mmap_mode="r"))
+
+    def align(self, index, maxAge=None):
+        """
+        AlignedBook over a Date index of bars: each bar gets the last snapshot taken at or before
+        the bar closes (its timestamp plus the median bar spacing). A snapshot only holds messages
+        from before its timestamp, so nothing from after the close leaks in. Snapshots older than
+        maxAge (a Timedelta or ns) count as missing.
+        """
+        index = pd.DatetimeIndex(index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        barTimes = (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
+        spacing = int(np.median(np.diff(barTimes))) if len(barTimes) > 1 else 0
+        closes = barTimes + spacing
+        rows = np.searchsorted(self.times, closes, side="right") - 1
+        if maxAge is not None and len(rows):
+            age = closes - self.times[np.maximum(rows, 0)]
+            rows = np.where(age <= pd.Timedelta(maxAge).value, rows, -1)
+        return AlignedBook(self.records, rows)
+
+
+class AlignedBook:
+    def __init__(self, records, rows):
+        """
+        Snapshot depth arrays gathered per bar; bar i uses snapshot rows[i] (-1: none yet)
+
+        bidPrice/bidSize/askPrice/askSize are (bars, depth). Features are vectorized over every
+        bar at once and cached, so strategies only index them.
+        """
+        self.rows = rows
+        present = rows >= 0
+        self.present = present
+        gathered = records[np.maximum(rows, 0)] if len(records) else np.zeros(len(rows), dtype=records.dtype)
+        self.depth = records.dtype["bidPrice"].shape[0]
+        for name in SIDES:
+            values = np.array(gathered[name], dtype=np.float64)
+            values[~present] = np.nan
+            setattr(self, name, values)
+        self._features = {}
+
+    def _cached(self, key, build):
+        if key not in self._features:
+            self._features[key] = build()
+        return self._features[key]
+
+    def imbalance(self, levels=None):
+        """(bid size - ask size) / total over the best levels, in [-1, 1]; NaN without a book"""
+        def build():
+            bid = np.nansum(self.bidSize[:, :levels], axis=1)
+            ask = np.nansum(self.askSize[:, :levels], axis=1)
+            total = bid + ask
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(self.present & (total > 0), (bid - ask) / total, np.nan)
+        return self._cached(("imbalance", levels), build)
+
+    def totalDepth(self, levels=None):
+        """Resting size on both sides over the best levels"""
+        return self._cached(("depth", levels), lambda: np.where(
+            self.present, np.nansum(self.bidSize[:, :levels], axis=1) + np.nansum(self.askSize[:, :levels], axis=1),
+            np.nan))
+
+    def mid(self):
+        return self._cached("mid", lambda: (self.bidPrice[:, 0] + self.askPrice[:, 0]) / 2)
+
+    def spread(self):
+        """Best ask - best bid as a fraction of the mid"""
+        return self._cached("spread", lambda: (self.askPrice[:, 0] - self.bidPrice[:, 0]) / self.mid())
+
+    def microprice(self):
+        """Mid weighted towards the side with less size at the touch"""
+        def build():
+            bid, ask = self.bidSize[:, 0], self.askSize[:, 0]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return (self.bidPrice[:, 0] * ask + self.askPrice[:, 0] * bid) / (bid + ask)
+        return self._cached("microprice", build)
+
+    def topColumns(self):
+        """Best level as BidPrice/BidSize/AskPrice/AskSize columns, the names strategies look up"""
+        return {"BidPrice": self.bidPrice[:, 0], "BidSize": self.bidSize[:, 0],
+                "AskPrice": self.askPrice[:, 0], "AskSize": self.askSize[:, 0]}
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    import time
+    import OrderBook
+    from DataScraping import ColumnarDataScraping
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "TSLA1.csv"
+    dataScraper = ColumnarDataScraping(path)
+    data = dataScraper.data
+    messages = OrderBook.synthesize(data)
+    # One snapshot every 10 seconds across the file, from the book the bars imply
+    grid = np.arange(messages["time"][0], messages["time"][-1], 10 * 10 ** 9)
+    begin = time.perf_counter()
+    snapshots = BookSnapshots.fromMessages(messages, grid, depth=10)
+    built = time.perf_counter() - begin
+    snapshotPath = os.path.join(tempfile.mkdtemp(), "book.npy")
+    snapshots.write(snapshotPath)
+    print(f"{len(snapshots):,} snapshots x {snapshots.depth} levels built in {built:.2f}s, "
+          f"{os.path.getsize(snapshotPath) / 1e6:.1f} MB on disk")
+
+    begin = time.perf_counter()
+    book = dataScraper.attachBook(BookSnapshots.read(snapshotPath))
+    print(f"Aligned to {len(data)} bars in {(time.perf_counter() - begin) * 1e3:.1f} ms; "
+          f"{book.present.mean():.0%} of bars have a snapshot")
+    print(pd.DataFrame({"imbalance5": book.imbalance(5), "depth": book.totalDepth(), "spread": book.spread(),
+                        "microprice": book.microprice()}, index=data.index).dropna().describe().to_string())
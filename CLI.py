@@ -0,0 +1,293 @@
+import argparse
+import ast
+import asyncio
+import os
+import sys
+import traceback
+
+import pandas as pd
+
+import Metrics
+import PaperTrading
+import Strategies
+from BackTesting import BackTesting
+from Catalog import Catalog
+from DataScraping import DataScraping
+from EventLog import EventLog
+from Instrumentation import Instrumentation
+from Ledger import BUY
+from Optimizer import SharedData, splitParams, workerData, workerPool
+
+
+def parseParams(items):
+    """["window=14", "name=fast"] -> {"window": 14, "name": "fast"}; values are Python literals or strings"""
+    params = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {item!r}")
+        try:
+            params[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            params[key] = value
+    return params
+
+
+def loadData(data):
+    """A DataScraping from a CSV path, a list of paths (concatenated), a Date-indexed frame or a DataScraping"""
+    if isinstance(data, DataScraping):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return DataScraping.fromData(data)
+    if isinstance(data, (list, tuple)):
+        return DataScraping(data[0]) if len(data) == 1 else DataScraping.fromFiles(data)
+    return DataScraping(data)
+
+
+def runStrategy(strategyClass, dataScraper, params=None, amount=1000, start=1, end=None, log=None,
+                instrumentation=None, keep=False):
+    """
+    Backtest one strategy; params may mix constructor arguments with drawDown/drawUp/extraCosts
+
+    Returns BatchTest's result dict (name, portfolio, shares, prices, dates, fills, events), plus the
+    BackTesting itself under "backTesting" when keep is set.
+    """
+    strategyParams, risk = splitParams(params or {})
+    date = dataScraper.getIndex(start)
+    strategy = strategyClass(dataScraper, date, **strategyParams)
+    backTesting = BackTesting(strategy, amount, dataScraper, 0, date, .9 * amount, risk["extraCosts"],
+                              risk["drawDown"], risk["drawUp"], log if log is not None else EventLog.quiet())
+    if instrumentation is not None:
+        instrumentation.instrument(backTesting)
+    backTesting.run(start, end)
+    if backTesting.bankrupt():
+        print(f"You are broke in {strategyClass.__name__}")
+    result = {
+        "name": strategyClass.__name__,
+        "portfolio": backTesting.portfolio.copy(),
+        "shares": backTesting.numStocks.copy(),
+        "prices": backTesting.closePrice.copy(),
+        "dates": pd.to_datetime(backTesting.ledger.bars["time"], utc=True),
+        "fills": backTesting.ledger.fills.copy(),
+        "events": backTesting.log.events(),
+    }
+    if keep:
+        result["backTesting"] = backTesting
+    return result
+
+
+def _runInWorker(strategyClass, params, amount, start, end):
+    return _safeRun(strategyClass, workerData(), params, amount, start, end)
+
+
+def _safeRun(strategyClass, dataScraper, params, amount, start, end, instrumentation=None, keep=False):
+    # One broken strategy shouldn't take the rest of the batch down with it
+    try:
+        return runStrategy(strategyClass, dataScraper, params, amount, start, end,
+                           instrumentation=instrumentation, keep=keep)
+    except Exception:
+        print(f"{strategyClass.__name__} failed:\n{traceback.format_exc()}", file=sys.stderr)
+        return None
+
+
+def runBatch(strategyClasses, data, params=None, amount=1000, start=1, end=None, workers=1,
+             instrumentation=None, keep=False):
+    """
+    Run several strategies over one dataset, in worker processes when workers > 1
+
+    Workers read the dataset from shared memory (as the Optimizer does). Instrumentation and
+    keep need the runs in this process, so they force workers=1. Failed strategies are reported
+    on stderr and left out of the returned results.
+    """
+    dataScraper = loadData(data)
+    if instrumentation is not None or keep:
+        workers = 1
+    workers = min(workers, len(strategyClasses))
+    if workers <= 1:
+        results = [_safeRun(cls, dataScraper, params, amount, start, end, instrumentation, keep)
+                   for cls in strategyClasses]
+    else:
+        shared = SharedData(dataScraper)
+        try:
+            with workerPool(shared.spec(), workers) as pool:
+                futures = [pool.submit(_runInWorker, cls, params, amount, start, end) for cls in strategyClasses]
+                results = [future.result() for future in futures]
+        finally:
+            shared.close()
+    return [result for result in results if result is not None]
+
+
+def summarize(results, dataScraper, start=1, end=None):
+    """BatchTest's performance table over the traded rows start..end-1, best total return first"""
+    if not results:
+        return pd.DataFrame()
+    data = dataScraper.data.iloc[start:end]
+    close = data["Close"]
+    buyAndHold = close.iloc[-1] / close.iloc[0] - 1
+    metrics = Metrics.table(results, index=data.index)
+    summary = pd.DataFrame([{
+        'Strategy': row['Strategy'],
+        'Final Value': row['finalValue'],
+        'Total Return (%)': row['totalReturn'] * 100,
+        'Annualized Return (%)': row['annualReturn'] * 100,
+        'Annualized Volatility (%)': row['annualVolatility'] * 100,
+        'Sharpe Ratio': row['sharpe'],
+        'Sortino Ratio': row['sortino'],
+        'Max Drawdown (%)': row['maxDrawdown'] * 100,
+        'Drawdown Bars': row['drawdownDuration'],
+        'Calmar Ratio': row['calmar'],
+        'Exposure (%)': row['exposure'] * 100,
+        'Hit Rate (%)': row['hitRate'] * 100,
+        'Turnover': row['turnover'],
+        # From the ledger: the event log is a ring buffer and drops old events on long runs
+        'Buys': int((results[i]['fills']['action'] == BUY).sum()),
+        'Stops': int(results[i]['fills']['stop'].sum()),
+        'Buy & Hold Return (%)': buyAndHold * 100
+    } for i, row in metrics.iterrows()])
+    return summary.sort_values(by='Total Return (%)', ascending=False)
+
+
+def plotResults(results, dataScraper, amount=1000, path=None, start=1, end=None):
+    """
+    Every portfolio against buy-and-hold over the traded rows start..end-1 on one chart; saved to
+    path instead of shown when given
+    """
+    import matplotlib.pyplot as plt
+
+    close = dataScraper.data["Close"].iloc[start:end]
+    plt.figure(figsize=(12, 7))
+    for result in results:
+        plt.plot(result['dates'], result['portfolio'], label=result['name'])
+    plt.plot(close.index, close * (amount / close.iloc[0]), label='Buy & Hold', linestyle='--', color='black')
+    plt.xlabel('Date')
+    plt.ylabel('Portfolio Value')
+    plt.title('Strategy Portfolio Comparison')
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    if path is not None:
+        plt.savefig(path)
+        plt.close()
+    else:
+        plt.show()
+
+
+def parser():
+    root = argparse.ArgumentParser(description="Backtest strategies from the command line")
+    commands = root.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Backtest one or more strategies over a dataset")
+    run.add_argument("--data", nargs="+", required=True, help="CSV file(s); several are concatenated in time")
+    run.add_argument("--strategy", nargs="+", default=["all"],
+                     help="Class or module names, Module:Class, or all (default)")
+    run.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                     help="Strategy argument or drawDown/drawUp/extraCosts, repeatable")
+    run.add_argument("--amount", type=float, default=1000)
+    run.add_argument("--start", type=int, default=1, help="First row to trade on")
+    run.add_argument("--end", type=int, help="Row to stop before")
+    run.add_argument("--workers", type=int, default=1, help="Processes to spread strategies across")
+    run.add_argument("--no-plot", action="store_true", help="Skip the comparison chart")
+    run.add_argument("--plot-file", help="Save the chart here instead of opening a window")
+    run.add_argument("--out", help="Write the summary table to this .csv or .json file")
+    run.add_argument("--profile", metavar="PATH", help="Instrument the runs and write collapsed stacks here")
+    run.add_argument("--report", action="store_true",
+                     help="Print each BackTesting's own report (BackTesting.displayData)")
+
+    commands.add_parser("list", help="Show the registered strategies and whether they import")
+
+    paper = commands.add_parser("paper", help="Paper-trade strategies on bars streamed from a replay server")
+    source = paper.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", nargs="+", help="CSV file(s) to replay through an in-process server")
+    source.add_argument("--connect", metavar="HOST:PORT|PATH",
+                        help="Running PaperTrading.py server (TCP address or Unix socket path)")
+    paper.add_argument("--strategy", nargs="+", default=["all"])
+    paper.add_argument("--param", action="append", default=[], metavar="KEY=VALUE")
+    paper.add_argument("--amount", type=float, default=1000)
+    paper.add_argument("--start", type=int, default=1)
+    paper.add_argument("--speed", type=float, default=0, help="Replay speed for --data, multiple of real time")
+    paper.add_argument("--unix", help="Serve --data over this Unix socket instead of TCP")
+    paper.add_argument("--queue", type=int, default=64, help="Bars each strategy may fall behind by")
+    paper.add_argument("--policy", choices=PaperTrading.POLICIES, default="block",
+                       help="Full queue: block the feed or skip the oldest bar")
+
+    catalog = commands.add_parser("catalog", help="Index a directory of quote files and list what they hold")
+    catalog.add_argument("--dir", default=".", help="Directory of CSVs; the index is kept there as catalog.json")
+    catalog.add_argument("--symbol")
+    catalog.add_argument("--start", help="Only files with bars on or after this time")
+    catalog.add_argument("--end", help="Only files with bars on or before this time")
+    catalog.add_argument("--freq", help="Bar spacing, e.g. 1min")
+    return root
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+
+    if args.command == "list":
+        classes, skipped = Strategies.load()
+        loaded = {cls.__name__ for cls in classes}
+        for module, name in Strategies.BATCH_STRATEGIES:
+            status = "ok" if name in loaded else f"unavailable ({skipped[name]})"
+            print(f"{name:35s} {module:35s} {status}")
+        return 0
+
+    if args.command == "paper":
+        strategyClasses, skipped = Strategies.resolve(args.strategy)
+        for name, error in skipped.items():
+            print(f"Skipping {name}: {error}", file=sys.stderr)
+        options = dict(params=parseParams(args.param), amount=args.amount, start=args.start,
+                       queueSize=args.queue, policy=args.policy)
+        if args.data:
+            summary = PaperTrading.run(loadData(args.data).data, strategyClasses, args.speed, args.unix, **options)
+        else:
+            host, sep, port = args.connect.rpartition(":")
+            address = (host, int(port)) if sep and port.isdigit() else args.connect
+            runners, _ = asyncio.run(PaperTrading.paperTrade(address, strategyClasses, **options))
+            summary = pd.DataFrame([runner.summary() for runner in runners])
+        print(summary.to_string(index=False, float_format='%.2f'))
+        return 0 if len(summary) else 1
+
+    if args.command == "catalog":
+        catalog = Catalog(args.dir)
+        reread = catalog.scan()
+        print(f"Indexed {len(catalog.entries)} files ({len(reread)} read)")
+        matches = catalog.query(args.symbol, args.start, args.end, args.freq)
+        print(matches.drop(columns=["hash", "size", "mtime"]).to_string(index=False))
+        return 0
+
+    dataScraper = loadData(args.data)
+    strategyClasses, skipped = Strategies.resolve(args.strategy)
+    for name, error in skipped.items():
+        print(f"Skipping {name}: {error}", file=sys.stderr)
+    instrumentation = Instrumentation() if args.profile else None
+    results = runBatch(strategyClasses, dataScraper, parseParams(args.param), args.amount, args.start, args.end,
+                       args.workers, instrumentation, keep=args.report)
+
+    for result in results:
+        print(f"Final portfolio value: ${result['portfolio'][-1]:,.2f}   |   Strategy: {result['name']}")
+        if args.report:
+            result["backTesting"].displayData()
+    summary = summarize(results, dataScraper, args.start, args.end)
+    if summary.empty:
+        print("\n==== No strategy results to summarize. ====")
+    else:
+        print("\n==== Strategy Performance Summary Table (Sorted by Total Return %) ====")
+        print(summary.to_string(index=False, float_format='%.2f'))
+        print("===========================================\n")
+    if args.out:
+        if os.path.splitext(args.out)[1].lower() == ".json":
+            summary.to_json(args.out, orient="records", indent=2)
+        else:
+            summary.to_csv(args.out, index=False)
+    if instrumentation is not None:
+        instrumentation.uninstrument()
+        print("\n==== Hot Path Profile (self time) ====")
+        print(instrumentation.table().to_string(index=False, float_format='%.3f'))
+        instrumentation.writeCollapsed(args.profile)
+        print(f"Collapsed stacks written to {args.profile}")
+    if results and not args.no_plot:
+        plotResults(results, dataScraper, args.amount, args.plot_file, args.start, args.end)
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import glob
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+from DataScraping import DataScraping
+
+INDEX_NAME = "catalog.json"
+FIELDS = ["file", "symbol", "first", "last", "freq", "rows", "hash", "size", "mtime"]
+# Ticker = leading capitals up to the first "Stock"/"ETF"/digit: SPYETFDataJuly2025 -> SPY, TSLA1 -> TSLA
+SYMBOL = re.compile(r"^([A-Z]+?)(?=ETF|Stock|\d|\.|$)")
+
+
+def symbolOf(path):
+    match = SYMBOL.match(os.path.basename(path))
+    return match.group(1) if match else os.path.splitext(os.path.basename(path))[0]
+
+
+def fileHash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def barFrequency(index):
+    """Median spacing of the bars as a pandas offset alias ("min", "30min", "D"...), None for < 2 bars"""
+    if len(index) < 2:
+        return None
+    return pd.tseries.frequencies.to_offset(pd.Series(index).diff().median()).freqstr
+
+
+class Catalog:
+    def __init__(self, directory=".", indexPath=None):
+        """
+        Metadata index over a directory of quote CSVs
+
+        Each file is described by what is inside it rather than its name: symbol (from the file
+        name, which is the only place it lives), first/last bar, bar frequency, row count and a
+        content hash. The index is kept in a small JSON file next to the data; scan() only opens
+        files whose size or modification time changed since it was written, and a changed file
+        with an identical hash keeps its entry. Frames read while scanning are kept by hash so a
+        following load() doesn't read them again.
+        """
+        self.directory = directory
+        self.indexPath = indexPath or os.path.join(directory, INDEX_NAME)
+        self.entries = {}
+        self._frames = {}
+        if os.path.exists(self.indexPath):
+            with open(self.indexPath) as f:
+                self.entries = {entry["file"]: entry for entry in json.load(f)}
+
+    def scan(self):
+        """Bring the index up to date with the directory and save it; returns the files (re)read"""
+        paths = sorted(glob.glob(os.path.join(self.directory, "*.csv")))
+        names = {os.path.basename(path) for path in paths}
+        reread = []
+        for path in paths:
+            name = os.path.basename(path)
+            stat = os.stat(path)
+            entry = self.entries.get(name)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+                continue
+            digest = fileHash(path)
+            if entry is None or entry["hash"] != digest:
+                data = DataScraping(path).data
+                self._frames[digest] = data
+                entry = {
+                    "file": name,
+                    "symbol": symbolOf(name),
+                    "first": data.index[0].isoformat() if len(data) else None,
+                    "last": data.index[-1].isoformat() if len(data) else None,
+                    "freq": barFrequency(data.index),
+                    "rows": len(data),
+                    "hash": digest,
+                }
+                reread.append(name)
+            self.entries[name] = dict(entry, size=stat.st_size, mtime=stat.st_mtime_ns)
+        for name in set(self.entries) - names:
+            del self.entries[name]
+        self.save()
+        return reread
+
+    def save(self):
+        with open(self.indexPath, "w") as f:
+            json.dump([self.entries[name] for name in sorted(self.entries)], f, indent=1)
+
+    def table(self):
+        if not self.entries:
+            return pd.DataFrame(columns=FIELDS)
+        frame = pd.DataFrame([self.entries[name] for name in sorted(self.entries)], columns=FIELDS)
+        frame["first"] = pd.to_datetime(frame["first"], utc=True)
+        frame["last"] = pd.to_datetime(frame["last"], utc=True)
+        return frame
+
+    def query(self, symbol=None, start=None, end=None, freq=None):
+        """Files holding symbol's bars at freq that overlap [start, end], earliest first"""
+        frame = self.table()
+        if frame.empty:
+            return frame
+        keep = frame["rows"] > 0
+        if symbol is not None:
+            keep &= frame["symbol"].str.upper() == symbol.upper()
+        if freq is not None:
+            wanted = pd.tseries.frequencies.to_offset(freq)
+            keep &= frame["freq"].map(lambda f: f is not None and pd.tseries.frequencies.to_offset(f) == wanted)
+        if start is not None:
+            keep &= frame["last"] >= _utc(start)
+        if end is not None:
+            keep &= frame["first"] <= _utc(end)
+        return frame[keep].sort_values(["first", "file"], ignore_index=True)
+
+    def read(self, name):
+        """One indexed file's frame, from memory when this catalog already read that content"""
+        entry = self.entries[name]
+        data = self._frames.get(entry["hash"])
+        if data is None:
+            data = self._frames[entry["hash"]] = DataScraping(os.path.join(self.directory, name)).data
+        return data
+
+    def load(self, symbol, start=None, end=None, freq=None):
+        """
+        One contiguous, time-sorted series from every matching file, trimmed to [start, end]
+
+        Overlapping bars are taken from the file that starts earliest (ties by name), like
+        DataScraping.fromFiles. Files of different bar frequencies can't be merged, so freq is
+        required when the symbol has more than one.
+        """
+        matches = self.query(symbol, start, end, freq)
+        if matches.empty:
+            raise KeyError(f"No {symbol} data in {self.directory} for that range")
+        if matches["freq"].nunique() > 1:
+            raise ValueError(f"{symbol} has bars at {sorted(matches['freq'].unique())}; pass freq to pick one")
+        data = pd.concat([self.read(name) for name in matches["file"]]).sort_index(kind="stable")
+        data = data[~data.index.duplicated(keep="first")]
+        if start is not None:
+            data = data[data.index >= _utc(start)]
+        if end is not None:
+            data = data[data.index <= _utc(end)]
+        return data
+
+    def scraper(self, symbol, start=None, end=None, freq=None):
+        return DataScraping.fromData(self.load(symbol, start, end, freq))
+
+
+def _utc(when):
+    stamp = pd.Timestamp(when)
+    return stamp.tz_localize("UTC") if stamp.tz is None else stamp.tz_convert("UTC")
+
+
+if __name__ == "__main__":
+    catalog = Catalog(os.path.dirname(os.path.abspath(__file__)))
+    print(f"Read: {catalog.scan()}")
+    print(catalog.table().drop(columns=["hash", "size", "mtime"]).to_string(index=False))
+    print(f"Read again: {catalog.scan()}")
+    nvda = catalog.load("NVDA", "2025-07-24", "2025-07-29", freq="1min")
+    print(f"\nNVDA 1min: {len(nvda)} bars, {nvda.index[0]} -> {nvda.index[-1]}")
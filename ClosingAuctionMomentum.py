@@ -1,9 +1,10 @@
 class ClosingAuctionMomentum:
-    def __init__(self, dataScraper, date, lookback=5, momentum_threshold=0.01):
+    def __init__(self, dataScraper, date, lookback=5, momentum_threshold=0.01, closing_window=15):
         self.date = date
         self.dataScraper = dataScraper
         self.lookback = lookback  # Number of periods to analyze momentum
         self.momentum_threshold = momentum_threshold  # Threshold for significant momentum
+        self.closing_window = closing_window  # Minutes before the regular close to trade in on intraday data
         
     def buy(self):
         curr_index = self.dataScraper.getRow(self.date)
@@ -17,9 +18,10 @@ class ClosingAuctionMomentum:
         # looking at recent price action and volume patterns
         
         # Calculate recent momentum (rate of change)
+        momentum = self.momentum(curr_index)
+        if momentum is None:
+            return False
         current_close = float(self.dataScraper.getDateData(self.date, "Close"))
-        lookback_close = float(self.dataScraper.getNumData(curr_index - self.lookback, "Close"))
-        momentum = (current_close - lookback_close) / lookback_close
         
         # Check if close is higher than open (bullish candle)
         current_open = float(self.dataScraper.getDateData(self.date, "Open"))
@@ -41,9 +43,10 @@ class ClosingAuctionMomentum:
             return False
             
         # Calculate recent momentum (rate of change)
+        momentum = self.momentum(curr_index)
+        if momentum is None:
+            return False
         current_close = float(self.dataScraper.getDateData(self.date, "Close"))
-        lookback_close = float(self.dataScraper.getNumData(curr_index - self.lookback, "Close"))
-        momentum = (current_close - lookback_close) / lookback_close
         
         # Check if close is lower than open (bearish candle)
         current_open = float(self.dataScraper.getDateData(self.date, "Open"))
@@ -57,6 +60,19 @@ class ClosingAuctionMomentum:
         # Sell signal: negative momentum below negative threshold, bearish candle, and increasing volume
         return momentum < -self.momentum_threshold and is_bearish and volume_increasing
     
+    def momentum(self, curr_index):
+        current_close = float(self.dataScraper.getDateData(self.date, "Close"))
+        lookback_index = curr_index - self.lookback
+        sessions = self.dataScraper.sessions
+        if sessions.intraday:
+            # Intraday bars: only the last closing_window minutes of regular trading lead into the auction,
+            # and momentum is measured within today's session rather than across the overnight gap
+            if not sessions.isRegular(curr_index) or sessions.minutesToClose(curr_index) > self.closing_window:
+                return None
+            lookback_index = max(lookback_index, sessions.sessionOpenRow(curr_index))
+        lookback_close = float(self.dataScraper.getNumData(lookback_index, "Close"))
+        return (current_close - lookback_close) / lookback_close
+
     def setDate(self, date):
         self.date = date
     
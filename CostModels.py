@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class PreparedCosts:
+    def __init__(self, base, impact):
+        """
+        Per-bar cost arrays for one dataset
+
+        The cost of trading q shares at price p on row t is
+            |q| * p * (base[t] + impact[t] * sqrt(|q|))
+        which covers flat, spread and square-root impact models with two array lookups.
+        """
+        self.base = np.asarray(base, dtype=np.float64)
+        self.impact = np.asarray(impact, dtype=np.float64)
+
+    def cost(self, row, shares, price):
+        shares = abs(shares)
+        return shares * price * (self.base[row] + self.impact[row] * np.sqrt(shares))
+
+    def costs(self, rows, shares, prices):
+        """Vectorized cost for arrays of rows, share quantities and prices"""
+        shares = np.abs(shares)
+        return shares * prices * (self.base[rows] + self.impact[rows] * np.sqrt(shares))
+
+
+class CostModel:
+    """Base class: subclasses return (base, impact) arrays over the dataset's rows"""
+
+    def arrays(self, data):
+        raise NotImplementedError
+
+    def prepare(self, data):
+        base, impact = self.arrays(data)
+        return PreparedCosts(base, impact)
+
+    def __add__(self, other):
+        return CombinedCost([self, other])
+
+
+class FixedBps(CostModel):
+    def __init__(self, bps=1.0):
+        """Flat cost in basis points of traded notional"""
+        self.bps = bps
+
+    def arrays(self, data):
+        rows = len(data)
+        return np.full(rows, self.bps / 1e4), np.zeros(rows)
+
+
+class SpreadProportional(CostModel):
+    def __init__(self, fraction=0.5, maxSpread=0.01):
+        """
+        Pay a fraction of the bar's High-Low range as a spread proxy (0.5 = crossing half the spread)
+
+        maxSpread caps the proxy, since a whole bar's range overstates the quoted spread on volatile bars
+        """
+        self.fraction = fraction
+        self.maxSpread = maxSpread
+
+    def arrays(self, data):
+        close = data["Close"].to_numpy(dtype=np.float64)
+        spread = (data["High"].to_numpy(dtype=np.float64) - data["Low"].to_numpy(dtype=np.float64)) / close
+        return self.fraction * np.minimum(spread, self.maxSpread), np.zeros(len(data))
+
+
+class SquareRootImpact(CostModel):
+    def __init__(self, coefficient=1.0, volatilityWindow=20):
+        """
+        Square-root market impact: cost fraction = coefficient * sigma * sqrt(shares / bar volume)
+
+        sigma is the rolling standard deviation of close-to-close log returns up to and including the bar
+        """
+        self.coefficient = coefficient
+        self.volatilityWindow = volatilityWindow
+
+    def arrays(self, data):
+        close = data["Close"].astype(float)
+        sigma = np.log(close).diff().rolling(self.volatilityWindow, min_periods=2).std().fillna(0)
+        volume = data["Volume"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            # No volume printed means no liquidity to estimate impact from; leave those bars at zero
+            impact = np.where(volume > 0, self.coefficient * sigma.to_numpy() / np.sqrt(volume), 0)
+        return np.zeros(len(data)), impact
+
+
+class CombinedCost(CostModel):
+    def __init__(self, models):
+        """Sum of several models, e.g. FixedBps(0.5) + SpreadProportional() + SquareRootImpact()"""
+        self.models = []
+        for model in models:
+            self.models.extend(model.models if isinstance(model, CombinedCost) else [model])
+
+    def arrays(self, data):
+        parts = [model.arrays(data) for model in self.models]
+        return sum(p[0] for p in parts), sum(p[1] for p in parts)
@@ -1,12 +1,38 @@
+import os
+
 import matplotlib.pyplot as plt
 import seaborn as sns
+import numpy as np
 import pandas as pd
+import QuoteParser
+from SessionIndex import SessionIndex
+from Timeframe import Timeframe
 class DataScraping:
-    def __init__(self):
-        csv_path = input("Enter the path to your CSV file: ")
-        self.data = pd.read_csv(csv_path, parse_dates=["Date"])
-        self.data["Volume"] = self.data["Volume"].astype(str).str.replace(",", "").astype(float)
-        self.data.set_index("Date", inplace=True)
+    def __init__(self, csv_path):
+        # Files in the bundled quote schema take the fixed-layout parser; anything else goes through pandas
+        data = QuoteParser.read(csv_path) if isinstance(csv_path, (str, os.PathLike)) else None
+        self.data = data if data is not None else self.clean(pd.read_csv(csv_path, parse_dates=["Date"]))
+
+    @staticmethod
+    def clean(frame):
+        """Raw quote CSV rows -> Date-indexed frame with a numeric Volume (it carries thousands separators)"""
+        frame["Volume"] = frame["Volume"].astype(str).str.replace(",", "").astype(float)
+        return frame.set_index("Date")
+
+    @classmethod
+    def fromData(cls, data):
+        """Wrap an already loaded, Date-indexed frame without touching disk"""
+        scraper = cls.__new__(cls)
+        scraper.data = data
+        return scraper
+
+    @classmethod
+    def fromFiles(cls, csv_paths):
+        """Concatenate several quote files into one series, keeping the first copy of overlapping bars"""
+        frames = [cls(path).data for path in csv_paths]
+        data = pd.concat(frames).sort_index(kind="stable")
+        return cls.fromData(data[~data.index.duplicated(keep="first")])
+
     def printData(self):
         print(self.data)
     def graphData(self, type):
@@ -33,8 +59,370 @@ class DataScraping:
     def getIndex(self, num):
         return self.data.index[num]
 
+    def hasRow(self, num):
+        """Whether row num exists; BackTesting.run steps until this is False when no end is given"""
+        return 0 <= num < len(self.data)
+
+    def sizeHint(self):
+        """Rows a run over this dataset is expected to record, for preallocating its ledger"""
+        return len(self.data)
+
+    def datasetKey(self):
+        """(rows, first, last timestamp in ns) identifying the dataset a checkpoint was written for"""
+        index = self.data.index
+        return len(index), pd.Timestamp(index[0]).value, pd.Timestamp(index[-1]).value
+
+    @property
+    def sessions(self):
+        """SessionIndex over the data (session ids, pre/regular/post, open/close rows), built on first use"""
+        if getattr(self, "_sessions", None) is None:
+            self._sessions = SessionIndex(self.data.index)
+            self._sessionCache = {}
+        return self._sessions
+
+    def _sessionArray(self, key, build):
+        sessions = self.sessions
+        if key not in self._sessionCache:
+            self._sessionCache[key] = build(sessions)
+        return self._sessionCache[key]
+
+    def priorClose(self, row):
+        """Close of the previous session's last regular bar (NaN in the first session)"""
+        return self._sessionArray("priorClose", lambda s: s.atRow(self.data["Close"], s.previousCloseRow))[row]
+
+    def sessionOpen(self, row):
+        """Open of the current session's first regular bar, NaN until it has printed"""
+        opens = self._sessionArray("sessionOpen", lambda s: s.atRow(self.data["Open"], s.regularOpenRow))
+        return opens[row] if self.sessions.sessionOpenRow(row) >= 0 else np.nan
+
+    def openingRange(self, row, minutes):
+        """(high, low) of the current session's first `minutes` of regular trading seen up to row"""
+        high, low = self._sessionArray(("openingRange", minutes),
+                                       lambda s: s.openingRange(self.data["High"], self.data["Low"], minutes))
+        return high[row], low[row]
+
+    def timeframe(self, freq):
+        """Coarse bars at freq ("5min", "15min", "1h", "D") with a no-look-ahead row map, built once per freq"""
+        if getattr(self, "_timeframes", None) is None:
+            self._timeframes = {}
+        if freq not in self._timeframes:
+            self._timeframes[freq] = Timeframe(self.data, freq)
+        return self._timeframes[freq]
+
+    def getFrameData(self, num, freq, type, lag=0):
+        """type of the latest freq bar completed as of base row num (lag steps further back)"""
+        return self.timeframe(freq).value(num, type, lag)
+
+    # Order book snapshots aligned to the bars (BookSnapshots.AlignedBook), once attachBook is called
+    book = None
+
+    def attachBook(self, snapshots, maxAge=None):
+        """
+        Align BookSnapshots to the bars for the order book strategies; the best level is also
+        added as BidPrice/BidSize/AskPrice/AskSize columns
+        """
+        self.book = snapshots.align(self.data.index, maxAge)
+        for column, values in self.book.topColumns().items():
+            self.data[column] = values
+        return self.book
+
+
+class ColumnarDataScraping(DataScraping):
+    """Same accessors as DataScraping, answered from NumPy column arrays instead of pandas indexing"""
+
+    def __init__(self, csv_path):
+        super().__init__(csv_path)
+        self.buildCache()
+
+    @classmethod
+    def fromData(cls, data):
+        scraper = super().fromData(data)
+        scraper.buildCache()
+        return scraper
+
+    def buildCache(self):
+        self.columns = {column: self.data[column].to_numpy() for column in self.data.columns}
+        # Duplicate timestamps make .loc return several rows; keep pandas semantics for those
+        self.rowOf = None
+        if self.data.index.is_unique:
+            # Keyed on nanoseconds, matching Timestamp.value whatever unit the index was parsed at
+            index = self.data.index
+            nanos = (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
+            self.rowOf = dict(zip(nanos.tolist(), range(len(index))))
+
+    def attachBook(self, snapshots, maxAge=None):
+        book = super().attachBook(snapshots, maxAge)
+        self.buildCache()
+        return book
+
+    def getDateData(self, date, type):
+        if self.rowOf is None:
+            return super().getDateData(date, type)
+        return self.columns[type][self.getRow(date)]
+
+    def getNumData(self, num, type):
+        return self.columns[type][num]
+
+    def getRow(self, date):
+        if self.rowOf is None:
+            return super().getRow(date)
+        return self.rowOf[date.value if isinstance(date, pd.Timestamp) else pd.Timestamp(date).value]
+
+
+class StreamingDataScraping(DataScraping):
+    def __init__(self, csv_path, window=5000, chunkRows=100000):
+        """
+        Reads a quote CSV in chunks, keeping only the last window rows before the newest bar asked for
+
+        Rows keep their global numbers, so strategies index exactly as with DataScraping: negative
+        rows count back from the end of the file (read on first use, keeping only its last window
+        rows), the file's first window rows stay available (strategies that never move their own
+        date keep looking theirs up) and reaching further back than window rows otherwise raises
+        IndexError. Memory for the data is bounded by about 3 x window + chunkRows rows rather
+        than the file size. A BackTesting run still records one ledger row per bar unless it is
+        given a ledgerPath, and its fills and logged trade events grow with the number of trades.
+
+        Whole-file views aren't available: self.data, sessions, timeframes, cost models and order
+        books raise NotImplementedError. That rules out ClosingAuctionMomentum, FlashEventResponse
+        and OpeningRangeBreakout (sessions) and AI1/AI2 (slices of self.data).
+        """
+        self.csv_path = csv_path
+        self.window = window
+        self.chunkRows = chunkRows
+        self.reader = pd.read_csv(csv_path, parse_dates=["Date"], chunksize=chunkRows)
+        self.offset = 0
+        self.exhausted = False
+        self.chunk = None
+        self.tail = None
+        self._load()
+        self.head = self._pinned(self.chunk.iloc[:window], 0)
+        self.first = int(self.times[0]) if len(self.times) else None
+
+    @property
+    def data(self):
+        raise NotImplementedError("Only a window of rows is loaded in streaming mode; "
+                                  "load the file with DataScraping for whole-file data")
+
+    def _load(self):
+        """Append the next chunk, dropping rows more than window behind; False at end of file"""
+        try:
+            chunk = self.clean(next(self.reader))
+        except StopIteration:
+            self.exhausted = True
+            self.reader.close()
+            return False
+        if self.chunk is not None:
+            keep = max(0, len(self.chunk) - self.window)
+            self.offset += keep
+            chunk = pd.concat([self.chunk.iloc[keep:], chunk])
+        self.chunk = chunk
+        self.columns = {column: chunk[column].to_numpy() for column in chunk.columns}
+        self.times = self._nanos(chunk.index)
+        return True
+
+    @staticmethod
+    def _nanos(index):
+        return (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
 
+    def _pinned(self, frame, start):
+        """Rows start.. of the file kept outside the sliding window"""
+        return {"start": start, "end": start + len(frame), "index": frame.index, "times": self._nanos(frame.index),
+                "columns": {column: frame[column].to_numpy() for column in frame.columns}}
 
+    def _tail(self):
+        """The file's last window rows and its row count, from one extra chunked pass on first use"""
+        if self.tail is None:
+            rows, last = 0, self.chunk.iloc[:0]
+            for chunk in pd.read_csv(self.csv_path, parse_dates=["Date"], chunksize=self.chunkRows):
+                rows += len(chunk)
+                last = pd.concat([last, self.clean(chunk)]).iloc[-self.window:]
+            self.tail = self._pinned(last, rows - len(last))
+        return self.tail
 
+    @property
+    def sessions(self):
+        raise NotImplementedError("Session lookups need the whole file; load it with DataScraping")
 
+    def timeframe(self, freq):
+        raise NotImplementedError("Timeframes need the whole file; load it with DataScraping")
 
+    def attachBook(self, snapshots, maxAge=None):
+        raise NotImplementedError("Book alignment needs the whole file; load it with DataScraping")
+
+    def sizeHint(self):
+        return self.window + self.chunkRows
+
+    def datasetKey(self):
+        # Same key as DataScraping over the same file, so either can resume the other's checkpoints
+        tail = self._tail()
+        return tail["end"], self.first, int(tail["times"][-1]) if tail["end"] else None
+
+    def hasRow(self, num):
+        while num >= self.offset + len(self.chunk):
+            if self.exhausted or not self._load():
+                return False
+        return num >= self.offset
+
+    def _locate(self, num):
+        """(columns, index, position) holding row num; negative rows count back from the end of the file"""
+        if num < 0:
+            tail = self._tail()
+            if num < -tail["end"]:
+                raise IndexError(f"Row {num} is before the start of the file ({tail['end']} rows)")
+            num += tail["end"]
+        if num < self.offset or num >= self.offset + len(self.chunk):
+            # Rows outside the window may be pinned; the tail also saves moving the window forward
+            for pinned in (self.head, self.tail):
+                if pinned is not None and pinned["start"] <= num < pinned["end"]:
+                    return pinned["columns"], pinned["index"], num - pinned["start"]
+        if num < self.offset:
+            raise IndexError(f"Row {num} is outside the streaming window (rows {self.offset}+); increase window")
+        if not self.hasRow(num):
+            raise IndexError(f"Row {num} is past the end of the file")
+        return self.columns, self.chunk.index, num - self.offset
+
+    def getNumData(self, num, type):
+        columns, _, position = self._locate(num)
+        return columns[type][position]
+
+    def getIndex(self, num):
+        _, index, position = self._locate(num)
+        return index[position]
+
+    def getRow(self, date):
+        value = date.value if isinstance(date, pd.Timestamp) else pd.Timestamp(date).value
+        position = np.searchsorted(self.times, value)
+        if position < len(self.times) and self.times[position] == value:
+            return self.offset + int(position)
+        for pinned in (self.head, self.tail):
+            if pinned is not None:
+                position = np.searchsorted(pinned["times"], value)
+                if position < len(pinned["times"]) and pinned["times"][position] == value:
+                    return pinned["start"] + int(position)
+        if len(self.times) and value < self.times[0]:
+            raise IndexError(f"{date} is outside the streaming window (from {self.getIndex(self.offset)}); "
+                             f"increase window")
+        raise KeyError(date)
+
+    def getDateData(self, date, type):
+        return self.getNumData(self.getRow(date), type)
+
+
+class LiveDataScraping(DataScraping):
+    def __init__(self, columns=None, capacity=1024):
+        """
+        A dataset that grows bar by bar, for feeding a run while the bars arrive
+
+        Columns are preallocated NumPy arrays that double when full, so append() is amortized O(1)
+        and the accessors are array lookups as in ColumnarDataScraping. Timestamps must strictly
+        increase. self.data is a DataFrame of the bars so far, rebuilt only when it's read after
+        an append; session and timeframe views are rebuilt along with it.
+        """
+        self.names = list(columns or QuoteParser.COLUMNS)
+        capacity = max(1, capacity)
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self._arrays = {name: np.full(capacity, np.nan) for name in self.names}
+        self.count = 0
+        self.rowOf = {}
+        self._changed()
+
+    @classmethod
+    def fromData(cls, data):
+        """Start from bars already loaded (e.g. DataScraping(csv).data), leaving room to append"""
+        columns = [c for c in data.columns if pd.api.types.is_numeric_dtype(data[c])]
+        scraper = cls(columns, capacity=2 * len(data))
+        scraper.extend(data)
+        return scraper
+
+    @staticmethod
+    def _nanos(date):
+        return date.value if isinstance(date, pd.Timestamp) else pd.Timestamp(date).value
+
+    def _reserve(self, rows):
+        if rows <= len(self.times):
+            return
+        capacity = max(rows, 2 * len(self.times))
+        times = np.zeros(capacity, dtype=np.int64)
+        times[:self.count] = self.times[:self.count]
+        self.times = times
+        for name, values in self._arrays.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self.count] = values[:self.count]
+            self._arrays[name] = grown
+
+    def append(self, date, values=None, **fields):
+        """Add one bar; values/fields map column names to numbers, columns left out are NaN"""
+        time = self._nanos(date)
+        if self.count and time <= self.times[self.count - 1]:
+            raise ValueError(f"Bar at {pd.Timestamp(time, tz='UTC')} is not after the last bar")
+        self._reserve(self.count + 1)
+        row = self.count
+        self.times[row] = time
+        for name, value in (dict(values or {}, **fields)).items():
+            self._arrays[name][row] = value
+        self.rowOf[time] = row
+        self.count += 1
+        self._changed()
+        return row
+
+    def extend(self, data):
+        """Append a Date-indexed frame of bars in one copy"""
+        if len(data) == 0:
+            return
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        times = (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
+        if (np.diff(times) <= 0).any() or (self.count and times[0] <= self.times[self.count - 1]):
+            raise ValueError("Bars must be in strictly increasing time order")
+        start, end = self.count, self.count + len(times)
+        self._reserve(end)
+        self.times[start:end] = times
+        for name in self.names:
+            if name in data.columns:
+                self._arrays[name][start:end] = data[name].to_numpy(dtype=np.float64)
+        self.rowOf.update(zip(times.tolist(), range(start, end)))
+        self.count = end
+        self._changed()
+
+    def _changed(self):
+        # Whole-dataset views describe the old bars; they're rebuilt on next use
+        self._frame = None
+        self._sessions = None
+        self._timeframes = None
+
+    @property
+    def columns(self):
+        return {name: values[:self.count] for name, values in self._arrays.items()}
+
+    @property
+    def data(self):
+        if self._frame is None:
+            index = pd.DatetimeIndex(self.times[:self.count].view("datetime64[ns]"), name="Date").tz_localize("UTC")
+            self._frame = pd.DataFrame({name: values[:self.count].copy() for name, values in self._arrays.items()},
+                                       index=index)
+        return self._frame
+
+    def attachBook(self, snapshots, maxAge=None):
+        raise NotImplementedError("Book alignment needs every bar up front; attach it to a DataScraping")
+
+    def hasRow(self, num):
+        return 0 <= num < self.count
+
+    def _local(self, num):
+        # Negative rows count back from the newest bar, like iloc
+        if not -self.count <= num < self.count:
+            raise IndexError(f"Row {num} hasn't arrived yet ({self.count} bars)")
+        return num % self.count
+
+    def getNumData(self, num, type):
+        return self._arrays[type][self._local(num)]
+
+    def getIndex(self, num):
+        return pd.Timestamp(self.times[self._local(num)], tz="UTC")
+
+    def getRow(self, date):
+        return self.rowOf[self._nanos(date)]
+
+    def getDateData(self, date, type):
+        return self._arrays[type][self.rowOf[self._nanos(date)]]
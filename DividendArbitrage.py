@@ -140,7 +140,9 @@ class DividendArbitrage:
         
         # Check prices over the next few days
         recovery = False
-        for i in range(index + 1, min(index + 5, self.dataScraper.data.shape[0])):
+        for i in range(index + 1, index + 5):
+            if not self.dataScraper.hasRow(i):
+                break
             current_price = float(self.dataScraper.getNumData(i, "Close"))
             
             # If price recovers at least 30% of the drop, consider it a recovery
@@ -0,0 +1,71 @@
+import sys
+from collections import deque
+
+import pandas as pd
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+QUIET = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+
+class EventLog:
+    def __init__(self, level=INFO, capacity=10000, stream=None, bufferLines=256, recordLevel=INFO):
+        """
+        Leveled event logger for a backtest run
+
+        Parameters:
+        level: Minimum level written to the stream (QUIET writes nothing)
+        capacity: Events kept in the ring buffer; the oldest are dropped first
+        stream: Where lines go, sys.stdout by default
+        bufferLines: Lines collected before one write to the stream
+        recordLevel: Minimum level kept in the ring buffer, so per-bar debug lines don't evict trades
+        """
+        self.level = level
+        self.stream = stream
+        self.bufferLines = bufferLines
+        self.recordLevel = recordLevel
+        self.buffer = deque(maxlen=capacity)
+        self.pending = []
+
+    @classmethod
+    def quiet(cls, capacity=10000):
+        """Records events for later reporting without printing anything"""
+        return cls(level=QUIET, capacity=capacity)
+
+    def log(self, level, event, date=None, **fields):
+        if level >= self.recordLevel:
+            self.buffer.append(dict(level=level, event=event, date=date, **fields))
+        if level >= self.level:
+            details = " ".join(f"{k}={v}" for k, v in fields.items())
+            self.pending.append(f"{date} {LEVEL_NAMES.get(level, level)} {event} {details}".rstrip())
+            if len(self.pending) >= self.bufferLines:
+                self.flush()
+
+    def debug(self, event, date=None, **fields):
+        self.log(DEBUG, event, date, **fields)
+
+    def info(self, event, date=None, **fields):
+        self.log(INFO, event, date, **fields)
+
+    def warning(self, event, date=None, **fields):
+        self.log(WARNING, event, date, **fields)
+
+    def flush(self):
+        """Write any buffered lines in a single call"""
+        if self.pending:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write("\n".join(self.pending) + "\n")
+            stream.flush()
+            self.pending = []
+
+    def events(self, event=None):
+        """Recorded events, optionally only those of one kind (e.g. "buy", "stop_loss")"""
+        if event is None:
+            return list(self.buffer)
+        return [e for e in self.buffer if e["event"] == event]
+
+    def toFrame(self, event=None):
+        return pd.DataFrame(self.events(event))
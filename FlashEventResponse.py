@@ -15,11 +15,10 @@ class FlashEventResponse:
         # In a real flash event response strategy, we would react to sudden price gaps or news
         # We'll simulate by looking for significant overnight gaps down
         
-        # Get current open price
-        current_open = float(self.dataScraper.getDateData(self.date, "Open"))
-        
-        # Get previous close price
-        prev_close = float(self.dataScraper.getNumData(curr_index - 1, "Close"))
+        # Get current open price and previous close price
+        current_open, prev_close = self.open_and_prev_close(curr_index)
+        if current_open is None:
+            return False
         
         # Calculate overnight gap as a percentage
         overnight_gap = (current_open - prev_close) / prev_close
@@ -43,11 +42,10 @@ class FlashEventResponse:
         if curr_index < 1:
             return False
             
-        # Get current open price
-        current_open = float(self.dataScraper.getDateData(self.date, "Open"))
-        
-        # Get previous close price
-        prev_close = float(self.dataScraper.getNumData(curr_index - 1, "Close"))
+        # Get current open price and previous close price
+        current_open, prev_close = self.open_and_prev_close(curr_index)
+        if current_open is None:
+            return False
         
         # Calculate overnight gap as a percentage
         overnight_gap = (current_open - prev_close) / prev_close
@@ -64,6 +62,16 @@ class FlashEventResponse:
                 intraday_move < 0 and  # Price is reversing
                 intraday_move > -overnight_gap * self.reversion_factor)  # But hasn't fully reversed yet
     
+    def open_and_prev_close(self, curr_index):
+        sessions = self.dataScraper.sessions
+        if not sessions.intraday:
+            return (float(self.dataScraper.getDateData(self.date, "Open")),
+                    float(self.dataScraper.getNumData(curr_index - 1, "Close")))
+        # Intraday bars: the gap is today's regular open against the prior session's regular close
+        if not sessions.isRegular(curr_index) or sessions.priorCloseRow(curr_index) < 0:
+            return None, None
+        return self.dataScraper.sessionOpen(curr_index), self.dataScraper.priorClose(curr_index)
+
     def setDate(self, date):
         self.date = date
     
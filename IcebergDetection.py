@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class IcebergDetection:
     def __init__(self, dataScraper, date, lookback=10, volume_threshold=2.0, consecutive_trades=3):
         self.date = date
@@ -49,6 +52,12 @@ class IcebergDetection:
         # 1. Repeated buying at the same price level
         # 2. Consistent volume that exceeds visible orders
         # 3. Price stability or upward bias despite large volume
+
+        # With recorded book snapshots, look for the refill itself at the best bid
+        book = getattr(self.dataScraper, "book", None)
+        if book is not None:
+            return (self.check_book_refill(end_index, book.bidPrice, book.bidSize) and
+                    not self.check_book_refill(end_index, book.askPrice, book.askSize))
         
         # Calculate average volume
         avg_volume = self.calculate_average_volume(end_index)
@@ -71,6 +80,11 @@ class IcebergDetection:
     def detect_sell_iceberg(self, end_index):
         """Detect potential sell-side iceberg orders based on volume and price patterns"""
         # Similar to buy-side detection, but looking for selling patterns
+
+        book = getattr(self.dataScraper, "book", None)
+        if book is not None:
+            return (self.check_book_refill(end_index, book.askPrice, book.askSize) and
+                    not self.check_book_refill(end_index, book.bidPrice, book.bidSize))
         
         # Calculate average volume
         avg_volume = self.calculate_average_volume(end_index)
@@ -90,6 +104,21 @@ class IcebergDetection:
         # 3. Price remains stable or has a downward bias despite large volume
         return consistent_selling and (repeated_volume_spikes or price_stability)
     
+    def check_book_refill(self, end_index, prices, sizes):
+        """
+        Check for a best level that holds its price for consecutive_trades bars while each bar
+        trades more than the size shown there, i.e. hidden size keeps refilling it (the detectors
+        ignore it when both sides do, as in a market that simply isn't moving)
+        """
+        start_index = end_index - self.consecutive_trades + 1
+        best_prices = prices[start_index:end_index + 1, 0]
+        best_sizes = sizes[start_index:end_index + 1, 0]
+        if start_index < 0 or np.isnan(best_prices).any():
+            return False
+        volumes = np.array([float(self.dataScraper.getNumData(i, "Volume"))
+                            for i in range(start_index, end_index + 1)])
+        return bool((best_prices == best_prices[0]).all() and (volumes > best_sizes).all())
+    
     def calculate_average_volume(self, end_index):
         """Calculate average volume over the lookback period"""
         total_volume = 0.0
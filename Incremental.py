@@ -0,0 +1,313 @@
+import math
+
+
+class RollingWindow:
+    def __init__(self, size):
+        """
+        Last size values with their running sum and sum of squares, updated in O(1) per push
+
+        Sums are kept relative to the first value seen so the variance doesn't cancel away at
+        price levels, and are recomputed from the buffer every size pushes so rounding can't drift.
+        """
+        self.size = size
+        self.values = [0.0] * size
+        self.position = 0
+        self.count = 0
+        self.pushes = 0
+        self.shift = None
+        self.total = 0.0
+        self.squares = 0.0
+        self.nonzero = 0
+
+    def push(self, value):
+        if self.shift is None:
+            self.shift = value
+        if self.count == self.size:
+            old = self.values[self.position]
+            self.total -= old - self.shift
+            self.squares -= (old - self.shift) ** 2
+            self.nonzero -= old != 0
+        else:
+            self.count += 1
+        self.values[self.position] = value
+        self.total += value - self.shift
+        self.squares += (value - self.shift) ** 2
+        self.nonzero += value != 0
+        self.position = (self.position + 1) % self.size
+        self.pushes += 1
+        if self.pushes % self.size == 0:
+            held = [v - self.shift for v in self.values[:self.count]]
+            self.total = math.fsum(held)
+            self.squares = math.fsum(v * v for v in held)
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    @property
+    def sum(self):
+        return self.total + self.shift * self.count if self.count else 0.0
+
+    @property
+    def mean(self):
+        return self.shift + self.total / self.count if self.count else math.nan
+
+    @property
+    def std(self):
+        """Population standard deviation, like MeanReversion.calculate_std"""
+        if not self.count:
+            return math.nan
+        mean = self.total / self.count
+        return max(self.squares / self.count - mean * mean, 0.0) ** 0.5
+
+
+class EMA:
+    def __init__(self, window):
+        """Recursive exponential average (alpha = 2 / (window + 1)) seeded with the first value"""
+        self.window = window
+        self.alpha = 2 / (window + 1)
+        self.value = None
+        self.count = 0
+
+    def push(self, value):
+        self.value = value if self.value is None else value * self.alpha + self.value * (1 - self.alpha)
+        self.count += 1
+
+    @property
+    def ready(self):
+        """Seen at least window values, so the seed no longer dominates"""
+        return self.count >= self.window
+
+
+class RSI:
+    def __init__(self, window=14):
+        """RSI_Strategy's RSI (simple averages of the last window gains and losses) in O(1) per close"""
+        self.gains = RollingWindow(window)
+        self.losses = RollingWindow(window)
+        self.last = None
+
+    def push(self, close):
+        if self.last is not None:
+            change = close - self.last
+            self.gains.push(change if change > 0 else 0.0)
+            self.losses.push(-change if change < 0 else 0.0)
+        self.last = close
+
+    @property
+    def value(self):
+        if not self.gains.full:
+            return 50.0
+        if self.losses.nonzero == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.gains.sum / self.losses.sum)
+
+
+class IncrementalStrategy:
+    # Bars to replay before a row that doesn't follow the last one; None replays from the start
+    lookback = None
+
+    def __init__(self, dataScraper, date):
+        """
+        Base for strategies whose indicators are updated once per new bar instead of recomputed
+
+        setDate() feeds the new row's bar to onBar(), which returns the indicator values for that
+        bar; buy()/sell() compare self.current with self.previous. Stepping one row at a time
+        (BackTesting.run, catchUp) costs O(1) per bar. Any other jump resets the indicators and
+        replays the lookback bars before the row.
+        """
+        self.dataScraper = dataScraper
+        self.row = None
+        self.previous = None
+        self.current = None
+        self.setDate(date)
+
+    def reset(self):
+        raise NotImplementedError
+
+    def onBar(self, row):
+        raise NotImplementedError
+
+    def _feed(self, row):
+        self.previous = self.current
+        self.current = self.onBar(row)
+        self.row = row
+
+    def setDate(self, date):
+        self.date = date
+        row = self.dataScraper.getRow(date)
+        if row == self.row:
+            return
+        if self.row is None or row != self.row + 1:
+            self.reset()
+            self.current = None
+            first = 0 if self.lookback is None else max(0, row - self.lookback)
+            for earlier in range(first, row):
+                self._feed(earlier)
+        self._feed(row)
+
+    def close(self, row):
+        return float(self.dataScraper.getNumData(row, "Close"))
+
+    def getType(self):
+        return "Close"
+
+
+class IncrementalRSI(IncrementalStrategy):
+    """RSI_Strategy's threshold crossings with the RSI carried from bar to bar"""
+
+    def __init__(self, dataScraper, date, window=14, buy_threshold=30, sell_threshold=70):
+        self.window = window
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self.lookback = window + 2
+        super().__init__(dataScraper, date)
+
+    def reset(self):
+        self.rsi = RSI(self.window)
+
+    def onBar(self, row):
+        self.rsi.push(self.close(row))
+        return self.rsi.value
+
+    def buy(self):
+        return self.previous is not None and self.previous <= self.buy_threshold < self.current
+
+    def sell(self):
+        return self.previous is not None and self.previous >= self.sell_threshold > self.current
+
+
+class IncrementalSMACross(IncrementalStrategy):
+    """SMA_Cross with running sums; no signal until both averages have a full window"""
+
+    def __init__(self, dataScraper, date, fast=5, slow=20):
+        self.fast = fast
+        self.slow = slow
+        self.lookback = max(fast, slow) + 1
+        super().__init__(dataScraper, date)
+
+    def reset(self):
+        self.fastWindow = RollingWindow(self.fast)
+        self.slowWindow = RollingWindow(self.slow)
+
+    def onBar(self, row):
+        close = self.close(row)
+        self.fastWindow.push(close)
+        self.slowWindow.push(close)
+        if not (self.fastWindow.full and self.slowWindow.full):
+            return None
+        return self.fastWindow.mean, self.slowWindow.mean
+
+    def buy(self):
+        if self.previous is None or self.current is None:
+            return False
+        return self.previous[0] <= self.previous[1] and self.current[0] > self.current[1]
+
+    def sell(self):
+        if self.previous is None or self.current is None:
+            return False
+        return self.previous[0] >= self.previous[1] and self.current[0] < self.current[1]
+
+
+class IncrementalEMACross(IncrementalSMACross):
+    """
+    EMA crossover on recursive EMAs
+
+    EMA_Cross re-seeds each EMA window bars back on every call, which can't be carried forward;
+    these are the usual recursive EMAs, so early crossings can differ from EMA_Cross's.
+    """
+    lookback = None
+
+    def __init__(self, dataScraper, date, fast=5, slow=20):
+        self.fast = fast
+        self.slow = slow
+        IncrementalStrategy.__init__(self, dataScraper, date)
+
+    def reset(self):
+        self.fastEma = EMA(self.fast)
+        self.slowEma = EMA(self.slow)
+
+    def onBar(self, row):
+        close = self.close(row)
+        self.fastEma.push(close)
+        self.slowEma.push(close)
+        if not (self.fastEma.ready and self.slowEma.ready):
+            return None
+        return self.fastEma.value, self.slowEma.value
+
+
+class IncrementalMeanReversion(IncrementalStrategy):
+    """MeanReversion's Bollinger-band entry and mean exit with a running mean and deviation"""
+
+    def __init__(self, dataScraper, date, window=20, std_dev=2):
+        self.window = window
+        self.std_dev = std_dev
+        self.lookback = window
+        super().__init__(dataScraper, date)
+
+    def reset(self):
+        self.closes = RollingWindow(self.window)
+
+    def onBar(self, row):
+        close = self.close(row)
+        self.closes.push(close)
+        return close, self.closes.mean, self.closes.std
+
+    def buy(self):
+        if self.row < self.window:
+            return False
+        price, mean, std = self.current
+        return price < mean - self.std_dev * std
+
+    def sell(self):
+        if self.row < self.window:
+            return False
+        price, mean, _ = self.current
+        return price >= mean
+
+
+if __name__ == "__main__":
+    import queue
+    import threading
+    import time
+    import SyntheticData
+    from BackTesting import BackTesting
+    from DataScraping import ColumnarDataScraping, LiveDataScraping
+    from EventLog import EventLog
+    from MeanReversion import MeanReversion
+    from RSI_Strategy import RSI_Strategy
+
+    def backTest(strategyClass, dataScraper):
+        strategy = strategyClass(dataScraper, dataScraper.getIndex(1))
+        return BackTesting(strategy, 1000, dataScraper, 0, dataScraper.getIndex(1), 900, 0, .02, .50,
+                           EventLog.quiet())
+
+    bars = SyntheticData.generate(20000, seed=11)
+    columnar = ColumnarDataScraping.fromData(bars)
+    for classic, incremental in ((RSI_Strategy, IncrementalRSI), (MeanReversion, IncrementalMeanReversion)):
+        timings = []
+        for strategyClass in (classic, incremental):
+            begin = time.perf_counter()
+            equity = backTest(strategyClass, columnar).run()
+            timings.append((time.perf_counter() - begin, equity[-1]))
+        print(f"{classic.__name__:15s} {timings[0][0]:6.2f}s ${timings[0][1]:,.4f}   "
+              f"{incremental.__name__:25s} {timings[1][0]:6.2f}s ${timings[1][1]:,.4f}")
+
+    # A producer thread replays the bars in small batches, standing in for a feed; the run only
+    # ever processes what has arrived
+    feed = queue.Queue()
+
+    def produce():
+        for start in range(100, len(bars), 250):
+            feed.put(bars.iloc[start:start + 250])
+        feed.put(None)
+
+    live = LiveDataScraping.fromData(bars.iloc[:100])
+    backTesting = backTest(IncrementalRSI, live)
+    threading.Thread(target=produce, daemon=True).start()
+    processed = backTesting.catchUp()
+    while (batch := feed.get()) is not None:
+        live.extend(batch)
+        processed += backTesting.catchUp()
+    batchRun = backTest(IncrementalRSI, columnar).run()
+    print(f"\nLive feed: {processed} bars processed as they arrived, final ${backTesting.portfolio[-1]:,.4f} "
+          f"(whole-file run ${batchRun[-1]:,.4f})")
@@ -0,0 +1,146 @@
+import threading
+import time
+import pandas as pd
+
+ACCESSORS = ("getDateData", "getNumData", "getRow", "getIndex")
+ENGINE_METHODS = ("update", "buy", "sell", "sellA", "fillOrders")
+UNATTRIBUTED = "<unattributed>"
+
+
+class _Frame:
+    __slots__ = ("key", "childNs")
+
+    def __init__(self, key):
+        self.key = key
+        self.childNs = 0
+
+
+class Instrumentation:
+    def __init__(self):
+        """
+        Opt-in call counters and timers for the backtest hot path
+
+        Methods are wrapped by shadowing them on the instance, so nothing changes for objects that
+        were never passed to instrument(); uninstrument() removes the wrappers again. Every call is
+        recorded under its full stack of wrapped callers, rooted at the strategy's name, which gives
+        both the per-(strategy, method) table and flame-graph stacks. The call stack is per thread,
+        so BatchTest's threads sharing one DataScraping are attributed to the right strategy.
+        """
+        # stack tuple -> [calls, inclusive ns, ns spent in wrapped children]
+        self.stats = {}
+        self.wrapped = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def wrap(self, obj, name, label=None, root=None):
+        """Shadow obj.name with a timed wrapper; root names the stack when nothing wrapped is calling"""
+        with self._lock:
+            if name in vars(obj):
+                return
+            method = getattr(obj, name)
+            # Claim the slot before building the wrapper so a second thread can't wrap twice
+            setattr(obj, name, method)
+            self.wrapped.append((obj, name))
+        label = label or f"{type(obj).__name__}.{name}"
+        stats, lock, stackOf = self.stats, self._lock, self._stack
+
+        def timed(*args, **kwargs):
+            stack = stackOf()
+            frame = _Frame(stack[-1].key + (label,) if stack else (root or UNATTRIBUTED, label))
+            stack.append(frame)
+            begin = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - begin
+                stack.pop()
+                if stack:
+                    stack[-1].childNs += elapsed
+                with lock:
+                    entry = stats.get(frame.key)
+                    if entry is None:
+                        entry = stats[frame.key] = [0, 0, 0]
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    entry[2] += frame.childNs
+
+        setattr(obj, name, timed)
+
+    def instrumentScraper(self, dataScraper):
+        for name in ACCESSORS:
+            self.wrap(dataScraper, name)
+
+    def instrumentStrategy(self, strategy, root=None):
+        """Wrap buy/sell and every helper method defined on the strategy's classes"""
+        root = root or type(strategy).__name__
+        for cls in type(strategy).__mro__[:-1]:
+            for name, value in vars(cls).items():
+                if callable(value) and not name.startswith("__"):
+                    self.wrap(strategy, name, root=root)
+
+    def instrument(self, backTesting):
+        """Wrap a BackTesting run: engine steps, its strategy and its dataset's accessors"""
+        root = type(backTesting.strategy).__name__
+        for name in ENGINE_METHODS:
+            self.wrap(backTesting, name, root=root)
+        self.instrumentStrategy(backTesting.strategy, root)
+        self.instrumentScraper(backTesting.dataScraper)
+        return backTesting
+
+    def uninstrument(self):
+        for obj, name in self.wrapped:
+            vars(obj).pop(name, None)
+        self.wrapped = []
+
+    def table(self):
+        """Calls, inclusive and self time per (strategy, method), slowest self time first"""
+        rows = [{"strategy": key[0], "method": key[-1], "calls": calls, "totalNs": total, "selfNs": total - child}
+                for key, (calls, total, child) in self.stats.items()]
+        if not rows:
+            return pd.DataFrame(columns=["strategy", "method", "calls", "totalMs", "selfMs", "meanUs"])
+        frame = pd.DataFrame(rows).groupby(["strategy", "method"], as_index=False).sum()
+        frame["totalMs"] = frame.pop("totalNs") / 1e6
+        frame["selfMs"] = frame.pop("selfNs") / 1e6
+        frame["meanUs"] = frame["totalMs"] * 1e3 / frame["calls"]
+        return frame.sort_values("selfMs", ascending=False, ignore_index=True)
+
+    def collapsed(self):
+        """Self time per stack in microseconds, one "root;caller;callee value" line each (flamegraph.pl input)"""
+        lines = []
+        for key, (calls, total, child) in sorted(self.stats.items()):
+            micros = (total - child) // 1000
+            if micros > 0:
+                lines.append(";".join(key) + f" {micros}")
+        return lines
+
+    def writeCollapsed(self, path):
+        with open(path, "w") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+
+
+if __name__ == "__main__":
+    import sys
+    from DataScraping import DataScraping
+    from BackTesting import BackTesting
+    from EventLog import EventLog
+    from RSI_Strategy import RSI_Strategy
+    from MeanReversion import MeanReversion
+
+    dataScraper = DataScraping("SPY2.csv")
+    instrumentation = Instrumentation()
+    for strategyClass in (RSI_Strategy, MeanReversion):
+        strategy = strategyClass(dataScraper, dataScraper.getIndex(1))
+        backTesting = BackTesting(strategy, 1000, dataScraper, 0, dataScraper.getIndex(1), 900, 0, .02, .50,
+                                  EventLog.quiet())
+        instrumentation.instrument(backTesting).run()
+        instrumentation.uninstrument()
+    print(instrumentation.table().to_string(index=False, float_format="%.3f"))
+    path = sys.argv[1] if len(sys.argv) > 1 else "profile.collapsed"
+    instrumentation.writeCollapsed(path)
+    print(f"Collapsed stacks written to {path}")
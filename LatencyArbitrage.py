@@ -53,6 +53,17 @@ class LatencyArbitrage:
         # based on what we've already seen on the "fast" exchange
         return price_diff > self.price_diff_threshold
     
+    def venue_signal(self, fast_price, slow_price):
+        """
+        Same thresholds across two real venues: 1 to buy on the slow venue (it hasn't caught up with
+        a rise yet), -1 to sell there, 0 to do nothing. VenueSimulator calls this on every quote.
+        """
+        if (fast_price - slow_price) / slow_price > self.price_diff_threshold:
+            return 1
+        if (slow_price - fast_price) / fast_price > self.price_diff_threshold:
+            return -1
+        return 0
+
     def setDate(self, date):
         self.date = date
     
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+NOTHING = 0
+BUY = 1
+SELL = 2
+ACTION_LABELS = np.array(["Nothing", "Buy", "Sell"])
+
+# One row per processed bar: 41 bytes packed, so a million bars is about 40 MB
+BAR_DTYPE = np.dtype([
+    ("time", np.int64),
+    ("action", np.int8),
+    ("price", np.float64),
+    ("cash", np.float64),
+    ("shares", np.float64),
+    ("equity", np.float64),
+])
+
+# One row per executed order; shares is the quantity traded, cash the balance afterwards and
+# stop marks the stop-loss/take-profit exits
+FILL_DTYPE = np.dtype([
+    ("time", np.int64),
+    ("action", np.int8),
+    ("price", np.float64),
+    ("shares", np.float64),
+    ("cash", np.float64),
+    ("stop", np.bool_),
+])
+
+
+class Ledger:
+    def __init__(self, capacity, fillCapacity=64, path=None):
+        """
+        Preallocated per-bar portfolio state plus a compact table of fills
+
+        With path, the bar rows are a memory-mapped file there (grown in place) instead of an
+        in-memory array, so resident memory doesn't have to grow with the number of bars.
+        """
+        self.path = path
+        capacity = max(1, capacity)
+        self.rows = self._mapRows(capacity, "w+") if path is not None else np.zeros(capacity, dtype=BAR_DTYPE)
+        self.count = 0
+        self.fillRows = np.zeros(max(1, fillCapacity), dtype=FILL_DTYPE)
+        self.fillCount = 0
+
+    def __getstate__(self):
+        # Only the used rows are worth writing to a checkpoint; capacity is restored on load
+        return {"rows": self.bars.copy(), "capacity": len(self.rows),
+                "fills": self.fills.copy(), "fillCapacity": len(self.fillRows)}
+
+    def __setstate__(self, state):
+        # A resumed ledger is in memory even if the original was file-backed
+        self.path = None
+        self.rows = np.zeros(state["capacity"], dtype=BAR_DTYPE)
+        self.count = len(state["rows"])
+        self.rows[:self.count] = state["rows"]
+        self.fillRows = np.zeros(state["fillCapacity"], dtype=FILL_DTYPE)
+        self.fillCount = len(state["fills"])
+        self.fillRows[:self.fillCount] = state["fills"]
+
+    @staticmethod
+    def _grow(array):
+        grown = np.zeros(len(array) * 2, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _mapRows(self, capacity, mode):
+        if mode == "r+":
+            self.rows.flush()
+            with open(self.path, "r+b") as f:
+                f.truncate(capacity * BAR_DTYPE.itemsize)
+        return np.memmap(self.path, dtype=BAR_DTYPE, mode=mode, shape=(capacity,))
+
+    def record(self, time, action, price, cash, shares, equity):
+        if self.count == len(self.rows):
+            self.rows = self._grow(self.rows) if self.path is None else self._mapRows(2 * len(self.rows), "r+")
+        self.rows[self.count] = (time, action, price, cash, shares, equity)
+        self.count += 1
+
+    def fill(self, time, action, price, shares, cash, stop=False):
+        if self.fillCount == len(self.fillRows):
+            self.fillRows = self._grow(self.fillRows)
+        self.fillRows[self.fillCount] = (time, action, price, shares, cash, stop)
+        self.fillCount += 1
+
+    @property
+    def bars(self):
+        """View of the recorded bars (no copy)"""
+        return self.rows[:self.count]
+
+    @property
+    def fills(self):
+        """View of the recorded fills (no copy)"""
+        return self.fillRows[:self.fillCount]
+
+    def last(self, field):
+        return self.rows[field][self.count - 1]
+
+    def toFrame(self, tz=None):
+        """Bars as a DataFrame with decoded dates and action labels, for printing and plotting"""
+        bars = self.bars
+        frame = pd.DataFrame({name: bars[name] for name in BAR_DTYPE.names if name != "time"})
+        frame.insert(0, "Date", self._dates(bars["time"], tz))
+        frame["action"] = ACTION_LABELS[bars["action"]]
+        return frame
+
+    def fillsFrame(self, tz=None):
+        fills = self.fills
+        frame = pd.DataFrame({name: fills[name] for name in FILL_DTYPE.names if name != "time"})
+        frame.insert(0, "Date", self._dates(fills["time"], tz))
+        frame["action"] = ACTION_LABELS[fills["action"]]
+        return frame
+
+    @staticmethod
+    def _dates(times, tz):
+        dates = pd.to_datetime(times, utc=tz is not None)
+        return dates.tz_convert(tz) if tz is not None else dates
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+# Regular US session length in minutes, used when a dataset covers a single day
+SESSION_MINUTES = 390
+# Keys summary() always returns; exposure, hitRate and turnover are added when shares are given
+SUMMARY_KEYS = ("totalReturn", "annualReturn", "annualVolatility", "sharpe", "sortino", "maxDrawdown",
+                "drawdownDuration", "calmar")
+
+
+def barsPerYear(index):
+    """Bars per year implied by a DatetimeIndex instead of assuming daily bars"""
+    if index is None or len(index) < 2:
+        return TRADING_DAYS
+    index = pd.DatetimeIndex(index)
+    spacing = pd.Series(index).diff().median()
+    if spacing >= pd.Timedelta(days=1):
+        return TRADING_DAYS * pd.Timedelta(days=1) / spacing
+    days = index.normalize().nunique()
+    if days > 1:
+        return TRADING_DAYS * len(index) / days
+    return TRADING_DAYS * pd.Timedelta(minutes=SESSION_MINUTES) / spacing
+
+
+def _returns(values):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return values[..., 1:] / values[..., :-1] - 1
+
+
+def drawdown(values):
+    """Max drawdown (negative fraction) and longest stretch in bars spent below a prior peak"""
+    peaks = np.maximum.accumulate(values, axis=-1)
+    depth = (values / peaks - 1).min(axis=-1)
+    # Bars since the most recent peak; its maximum is the longest underwater stretch
+    steps = np.broadcast_to(np.arange(values.shape[-1]), values.shape)
+    lastPeak = np.maximum.accumulate(np.where(values >= peaks, steps, 0), axis=-1)
+    duration = (steps - lastPeak).max(axis=-1)
+    return depth, duration
+
+
+def hitRate(held, values):
+    """
+    Share of closed round trips (flat -> long -> flat) that made money, NaN without any
+
+    held: Bool per bar, True while a position is open
+    values: Portfolio value per bar; a trip's result is the value after its exit against the value
+    before its entry, so costs count and adding to an open position stays part of the same trip
+    """
+    edges = np.diff(np.concatenate(([False], held)).astype(np.int8))
+    exits = np.flatnonzero(edges == -1)
+    if not len(exits):
+        return np.nan
+    entries = np.flatnonzero(edges == 1)[:len(exits)]
+    return float((values[exits] > values[np.maximum(entries - 1, 0)]).mean())
+
+
+def summary(portfolio, index=None, shares=None, prices=None, periodsPerYear=None):
+    """
+    Performance metrics for one portfolio curve or a (strategies, bars) matrix of them
+
+    Parameters:
+    portfolio: Portfolio values per bar; 2-D input gives one result per row
+    index: Bar timestamps, used to derive the annualisation factor
+    shares: Shares held per bar (same shape as portfolio), enables turnover/exposure/hit rate
+    (winning share of closed round trips)
+    prices: Price per bar (1-D or same shape as portfolio), needed with shares for turnover
+    periodsPerYear: Override the annualisation factor derived from index
+
+    Returns a dict of floats for 1-D input or of arrays for 2-D input
+    """
+    values = np.asarray(portfolio, dtype=float)
+    single = values.ndim == 1
+    values = np.atleast_2d(values)
+    if periodsPerYear is None:
+        periodsPerYear = barsPerYear(index)
+
+    returns = _returns(values)
+    bars = returns.shape[-1]
+    mean = returns.mean(axis=-1) if bars else np.full(len(values), np.nan)
+    std = returns.std(axis=-1, ddof=1) if bars > 1 else np.full(len(values), np.nan)
+    downside = np.sqrt((np.minimum(returns, 0) ** 2).mean(axis=-1)) if bars else np.full(len(values), np.nan)
+
+    annualReturn = mean * periodsPerYear
+    annualVolatility = std * np.sqrt(periodsPerYear)
+    maxDrawdown, drawdownDuration = drawdown(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = {
+            "totalReturn": values[:, -1] / values[:, 0] - 1,
+            "annualReturn": annualReturn,
+            "annualVolatility": annualVolatility,
+            "sharpe": np.where(annualVolatility != 0, annualReturn / annualVolatility, np.nan),
+            "sortino": np.where(downside != 0, annualReturn / (downside * np.sqrt(periodsPerYear)), np.nan),
+            "maxDrawdown": maxDrawdown,
+            "drawdownDuration": drawdownDuration,
+            "calmar": np.where(maxDrawdown != 0, annualReturn / -maxDrawdown, np.nan),
+        }
+
+        if shares is not None:
+            held = np.atleast_2d(np.asarray(shares, dtype=float)) > 0
+            result["exposure"] = held.mean(axis=-1)
+            result["hitRate"] = np.array([hitRate(h, v) for h, v in zip(held, values)])
+            if prices is not None:
+                traded = np.abs(np.diff(np.atleast_2d(np.asarray(shares, dtype=float)), axis=-1))
+                notional = (traded * np.atleast_2d(np.asarray(prices, dtype=float))[..., 1:]).sum(axis=-1)
+                # Traded value as a multiple of the average portfolio value
+                result["turnover"] = notional / values.mean(axis=-1)
+
+    if single:
+        return {name: float(value[0]) for name, value in result.items()}
+    return result
+
+
+def table(results, index=None, periodsPerYear=None):
+    """
+    Summary rows for many runs at once
+
+    results: list of dicts with 'name' and 'portfolio' (optionally 'shares' and 'prices');
+    shorter curves (e.g. runs that went bankrupt) are held flat at their last value
+    """
+    length = max(len(r["portfolio"]) for r in results)
+
+    def pad(rows):
+        return np.array([np.pad(np.asarray(r, dtype=float), (0, length - len(r)), mode="edge") for r in rows])
+
+    portfolios = pad([r["portfolio"] for r in results])
+    shares = pad([r["shares"] for r in results]) if all("shares" in r for r in results) else None
+    prices = pad([r["prices"] for r in results]) if shares is not None and all("prices" in r for r in results) else None
+    metrics = summary(portfolios, index=index, shares=shares, prices=prices, periodsPerYear=periodsPerYear)
+    frame = pd.DataFrame(metrics)
+    frame.insert(0, "Strategy", [r["name"] for r in results])
+    frame.insert(1, "finalValue", portfolios[:, -1])
+    return frame
@@ -1,8 +1,11 @@
+import math
+
+
 class OpeningRangeBreakout:
     def __init__(self, dataScraper, date, lookback=3, breakout_factor=1.2):
         self.date = date
         self.dataScraper = dataScraper
-        self.lookback = lookback  # Number of periods to define the opening range
+        self.lookback = lookback  # Number of periods (minutes of regular trading on intraday data) to define the opening range
         self.breakout_factor = breakout_factor  # Factor to determine breakout threshold
         
     def buy(self):
@@ -11,6 +14,9 @@ class OpeningRangeBreakout:
         # Need enough data for the lookback
         if curr_index < self.lookback:
             return False
+
+        if self.dataScraper.sessions.intraday:
+            return self.intraday_breakout(curr_index) > 0
             
         # In a real opening range breakout strategy, we would use intraday data to define the opening range
         # Since we only have daily data, we'll simulate by using the high/low range of the past few days
@@ -47,6 +53,9 @@ class OpeningRangeBreakout:
         # Need enough data for the lookback
         if curr_index < self.lookback:
             return False
+
+        if self.dataScraper.sessions.intraday:
+            return self.intraday_breakout(curr_index) < 0
             
         # Calculate the opening range high and low
         range_high = float('-inf')
@@ -74,6 +83,24 @@ class OpeningRangeBreakout:
         # Sell signal: price breaks below the lower breakdown level with momentum
         return current_price < breakdown_level and current_price < prev_price
     
+    def intraday_breakout(self, curr_index):
+        # On intraday bars the opening range is the session's first `lookback` minutes of regular trading,
+        # and breakouts only count once that range is complete: 1 above, -1 below, 0 otherwise
+        sessions = self.dataScraper.sessions
+        if not sessions.isRegular(curr_index) or sessions.minuteOfSession[curr_index] < self.lookback:
+            return 0
+        range_high, range_low = self.dataScraper.openingRange(curr_index, self.lookback)
+        if math.isnan(range_high):
+            return 0
+        range_size = range_high - range_low
+        current_price = float(self.dataScraper.getDateData(self.date, "Close"))
+        prev_price = float(self.dataScraper.getNumData(curr_index - 1, "Close"))
+        if current_price > range_high + range_size * (self.breakout_factor - 1) and current_price > prev_price:
+            return 1
+        if current_price < range_low - range_size * (self.breakout_factor - 1) and current_price < prev_price:
+            return -1
+        return 0
+
     def setDate(self, date):
         self.date = date
     
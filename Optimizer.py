@@ -0,0 +1,238 @@
+import os
+import math
+import random
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import Metrics
+from DataScraping import DataScraping
+from BackTesting import BackTesting
+from EventLog import EventLog
+
+# Parameters that belong to BackTesting rather than to the strategy constructor
+RISK_PARAMS = ("drawDown", "drawUp", "extraCosts")
+DEFAULT_RISK = {"drawDown": .02, "drawUp": .50, "extraCosts": 0}
+
+
+class SharedData:
+    """Publishes the numeric columns of a dataset once in shared memory so workers don't pickle it"""
+
+    def __init__(self, dataScraper):
+        data = dataScraper.data
+        self.columns = [c for c in data.columns if pd.api.types.is_numeric_dtype(data[c])]
+        self.rows = len(data)
+        self.tz = str(data.index.tz) if getattr(data.index, "tz", None) is not None else None
+
+        size = max(1, self.rows * (len(self.columns) + 1) * 8)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        index, values = SharedData._views(self.shm, self.rows, len(self.columns))
+        index[:] = (data.index.as_unit("ns") if hasattr(data.index, "as_unit") else data.index).asi8
+        values[:] = data[self.columns].to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _views(shm, rows, width):
+        # The int64 timestamps come first, followed by a row-major float64 block
+        index = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf)
+        values = np.ndarray((rows, width), dtype=np.float64, buffer=shm.buf, offset=rows * 8)
+        return index, values
+
+    def spec(self):
+        return self.shm.name, self.rows, self.columns, self.tz
+
+    @staticmethod
+    def attach(spec):
+        """Rebuild a DataScraping over the shared block; the caller must keep the returned handle alive"""
+        name, rows, columns, tz = spec
+        shm = shared_memory.SharedMemory(name=name)
+        index, values = SharedData._views(shm, rows, len(columns))
+        dates = pd.to_datetime(index, utc=tz is not None)
+        if tz is not None:
+            dates = dates.tz_convert(tz)
+        data = pd.DataFrame(values, index=pd.DatetimeIndex(dates, name="Date"), columns=columns, copy=False)
+        return shm, DataScraping.fromData(data)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def splitParams(params):
+    """Separate a candidate into (strategy kwargs, BackTesting risk settings)"""
+    strategyParams = {k: v for k, v in params.items() if k not in RISK_PARAMS}
+    risk = dict(DEFAULT_RISK)
+    risk.update({k: v for k, v in params.items() if k in RISK_PARAMS})
+    return strategyParams, risk
+
+
+def score(portfolio, amount, index=None):
+    """Summary statistics used to rank candidates; too short a run gets every metric as NaN"""
+    if len(portfolio) < 2:
+        metrics = dict.fromkeys(Metrics.SUMMARY_KEYS, np.nan)
+        metrics["finalValue"] = float(portfolio[-1]) if len(portfolio) else amount
+        return metrics
+    metrics = Metrics.summary(portfolio, index=index)
+    metrics["finalValue"] = float(portfolio[-1])
+    return metrics
+
+
+def evaluate(dataScraper, strategyClass, params, end=None, amount=1000, start=1):
+    """Run one candidate over rows start..end and score it; earlier rows stay visible as history"""
+    strategyParams, risk = splitParams(params)
+    date = dataScraper.getIndex(start)
+    strategy = strategyClass(dataScraper, date, **strategyParams)
+    backTesting = BackTesting(strategy, amount, dataScraper, 0, date, .9 * amount,
+                              risk["extraCosts"], risk["drawDown"], risk["drawUp"], EventLog.quiet())
+    backTesting.run(start, end)
+    return score(backTesting.portfolio, amount, dataScraper.data.index[start:start + len(backTesting.portfolio)])
+
+
+_worker = {}
+
+
+def _initWorker(spec):
+    _worker["shm"], _worker["dataScraper"] = SharedData.attach(spec)
+
+
+def workerPool(spec, workers):
+    """Process pool whose workers attach the SharedData behind spec; read it there with workerData()"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_initWorker, initargs=(spec,))
+
+
+def workerData():
+    """The DataScraping a workerPool() worker attached"""
+    return _worker["dataScraper"]
+
+
+def _evaluateInWorker(strategyClass, params, end, amount):
+    return evaluate(workerData(), strategyClass, params, end, amount)
+
+
+class Optimizer:
+    def __init__(self, strategyClass, dataScraper, metric="sharpe", amount=1000, workers=None):
+        """
+        Parameter search over a strategy and the BackTesting risk settings
+
+        Parameters:
+        strategyClass: Strategy to tune, constructed as strategyClass(dataScraper, date, **params)
+        dataScraper: Loaded dataset
+        metric: Metrics.summary() key (or "finalValue") to maximise, e.g. "sharpe", "sortino", "calmar"
+        amount: Starting cash for every candidate
+        workers: Process count; 1 evaluates in-process, None uses every core
+        """
+        self.strategyClass = strategyClass
+        self.dataScraper = dataScraper
+        self.metric = metric
+        self.amount = amount
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    # ------------------- Candidate Generation ------------------- #
+    @staticmethod
+    def grid(space):
+        """Every combination of a {name: [values]} space"""
+        names = list(space)
+        return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+    @staticmethod
+    def sample(space, samples, seed=None):
+        """Random candidates; lists are sampled from, (low, high) tuples drawn uniformly"""
+        rng = random.Random(seed)
+        candidates = []
+        for _ in range(samples):
+            params = {}
+            for name, values in space.items():
+                if isinstance(values, tuple):
+                    low, high = values
+                    if isinstance(low, int) and isinstance(high, int):
+                        params[name] = rng.randint(low, high)
+                    else:
+                        params[name] = rng.uniform(low, high)
+                else:
+                    params[name] = rng.choice(list(values))
+            candidates.append(params)
+        return candidates
+
+    # ------------------- Searches ------------------- #
+    def gridSearch(self, space, halving=False, eta=3, minBars=100):
+        return self.search(self.grid(space), halving, eta, minBars)
+
+    def randomSearch(self, space, samples, seed=None, halving=False, eta=3, minBars=100):
+        return self.search(self.sample(space, samples, seed), halving, eta, minBars)
+
+    def search(self, candidates, halving=False, eta=3, minBars=100):
+        """Evaluate candidates and return a table ranked by the chosen metric"""
+        rows = len(self.dataScraper.data)
+        shared = SharedData(self.dataScraper) if self.workers > 1 else None
+        pool = workerPool(shared.spec(), self.workers) if shared is not None else None
+        try:
+            if halving:
+                records = self._successiveHalving(pool, candidates, rows, eta, minBars)
+            else:
+                records = self._evaluateAll(pool, candidates, rows)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if shared is not None:
+                shared.close()
+        return self._rank(records)
+
+    def _evaluateAll(self, pool, candidates, end):
+        if pool is None:
+            scores = [evaluate(self.dataScraper, self.strategyClass, p, end, self.amount) for p in candidates]
+        else:
+            n = len(candidates)
+            scores = list(pool.map(_evaluateInWorker, [self.strategyClass] * n, candidates,
+                                   [end] * n, [self.amount] * n))
+        return [dict(params=p, bars=end, **s) for p, s in zip(candidates, scores)]
+
+    def _successiveHalving(self, pool, candidates, rows, eta, minBars):
+        """Score everyone on a short prefix, keep the best 1/eta, grow the prefix by eta, repeat"""
+        rungs = max(0, int(math.floor(math.log(max(len(candidates), 1), eta))))
+        budget = max(minBars, int(rows / eta ** rungs))
+        survivors = list(candidates)
+        records = []
+        while True:
+            end = min(budget, rows)
+            rung = self._evaluateAll(pool, survivors, end)
+            if end >= rows or len(survivors) <= 1:
+                records.extend(rung)
+                break
+            rung.sort(key=lambda r: self._key(r), reverse=True)
+            keep = max(1, int(math.ceil(len(rung) / eta)))
+            records.extend(rung[keep:])
+            survivors = [r["params"] for r in rung[:keep]]
+            budget *= eta
+        return records
+
+    def _key(self, record):
+        value = record[self.metric]
+        return -np.inf if value is None or np.isnan(value) else value
+
+    def _rank(self, records):
+        # "params" keeps each candidate's original dict, since the per-name columns may be upcast
+        table = pd.DataFrame([dict(r["params"], **{k: v for k, v in r.items() if k != "params"}, params=r["params"])
+                              for r in records])
+        if table.empty:
+            return table
+        # Candidates that survived to longer evaluations rank above those pruned early
+        table = table.sort_values(by=["bars", self.metric], ascending=False, na_position="last")
+        return table.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import sys
+    from RSI_Strategy import RSI_Strategy
+
+    dataScraper = DataScraping(sys.argv[1] if len(sys.argv) > 1 else "SPY2.csv")
+    optimizer = Optimizer(RSI_Strategy, dataScraper)
+    table = optimizer.gridSearch({
+        "window": [7, 14, 21],
+        "buy_threshold": [20, 25, 30, 35],
+        "sell_threshold": [65, 70, 75, 80],
+        "drawDown": [.01, .02, .05],
+    }, halving=True)
+    pd.set_option('display.max_rows', None)
+    print(table.drop(columns="params").to_string(float_format='%.4f'))
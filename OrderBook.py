@@ -0,0 +1,434 @@
+import array
+
+import numpy as np
+import pandas as pd
+
+import Orders
+
+# Book messages. side is the resting side the message applies to, so a TRADE on BID is a sell
+# hitting the bids. SET gives a level's new total depth (L2 feeds); ADD/CANCEL change it by qty
+# and, with an orderId, identify single orders (L3).
+ADD = 0
+CANCEL = 1
+TRADE = 2
+SET = 3
+BID = 0
+ASK = 1
+
+MESSAGE_DTYPE = np.dtype([
+    ("time", np.int64),
+    ("kind", np.int8),
+    ("side", np.int8),
+    ("price", np.float64),
+    ("qty", np.float64),
+    ("orderId", np.int64),
+])
+
+FILL_COLUMNS = ["time", "order", "side", "price", "qty"]
+
+
+def readMessages(path):
+    """Messages from a .npy file of MESSAGE_DTYPE (memory-mapped) or a CSV with the same columns"""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    frame = pd.read_csv(path)
+    messages = np.zeros(len(frame), dtype=MESSAGE_DTYPE)
+    for name in MESSAGE_DTYPE.names:
+        if name == "time" and not pd.api.types.is_integer_dtype(frame[name]):
+            messages[name] = pd.to_datetime(frame[name], utc=True).dt.as_unit("ns").astype("int64")
+        elif name in frame:
+            messages[name] = frame[name]
+        else:
+            messages[name] = -1
+    return messages
+
+
+def writeMessages(path, messages):
+    np.save(path, np.asarray(messages, dtype=MESSAGE_DTYPE))
+
+
+class _Order:
+    __slots__ = ("id", "side", "level", "tick", "remaining", "ahead", "sequence")
+
+    def __init__(self, orderId, side, tick, qty, ahead, sequence):
+        self.id = orderId
+        self.side = side
+        self.level = BID if side == Orders.BUY else ASK
+        self.tick = tick
+        self.remaining = qty
+        self.ahead = ahead
+        self.sequence = sequence
+
+
+class OrderBook:
+    def __init__(self, tickSize=0.01, capacity=4096, cancels="proportional"):
+        """
+        Price-level book on tick-indexed depth arrays, with queue positions for our own orders
+
+        Each side is one float array of depth per tick, re-centred and doubled when a price falls
+        outside it, so updates are array writes and the best price only needs a vectorized scan
+        when its level empties. The arrays are array.array so single-level reads and writes stay
+        cheap Python floats, with NumPy views over the same memory for the scans. Our orders
+        aren't added to the depth (the data was recorded without them). A marketable one first
+        takes the opposite side's depth up to its limit; the rest joins the back of its level and
+        moves up as volume ahead of it trades. Resting orders fill as trades reach them, or in full
+        when trades print through their price.
+
+        cancels: how L2 cancellations at our level are split, since L2 data can't say:
+        "proportional" takes them from ahead of us in proportion to the queue ahead, "behind"
+        (conservative) takes them from behind us first. L3 cancels with orderIds are exact.
+        """
+        if cancels not in ("proportional", "behind"):
+            raise ValueError(f"cancels must be 'proportional' or 'behind', got {cancels!r}")
+        self.tickSize = tickSize
+        self.cancels = cancels
+        self.depth = [array.array("d", bytes(8 * capacity)) for _ in (BID, ASK)]
+        self.origin = None
+        self.best = [None, None]
+        self.mine = {}
+        self.nextId = 0
+        # Live L3 orderId -> sequence number of its ADD, to tell whether it rests ahead of ours
+        self.sequence = 0
+        self.l3 = {}
+        self.fills = []
+        self.time = 0
+
+    def tick(self, price):
+        return int(np.rint(price / self.tickSize))
+
+    def _slot(self, tick):
+        if self.origin is None:
+            self.origin = tick - len(self.depth[BID]) // 2
+        slot = tick - self.origin
+        size = len(self.depth[BID])
+        if 0 <= slot < size:
+            return slot
+        # Re-centre on the levels in use plus this one, with room to spare either side
+        used = [tick]
+        for side in (BID, ASK):
+            nonzero = np.flatnonzero(self.levels(side))
+            if len(nonzero):
+                used += [self.origin + int(nonzero[0]), self.origin + int(nonzero[-1])]
+        low, high = min(used), max(used)
+        while size < 2 * (high - low + 1):
+            size *= 2
+        origin = (low + high) // 2 - size // 2
+        for side in (BID, ASK):
+            grown = np.zeros(size)
+            levels = self.levels(side)
+            nonzero = np.flatnonzero(levels)
+            grown[nonzero + self.origin - origin] = levels[nonzero]
+            self.depth[side] = array.array("d", grown.tobytes())
+        self.origin = origin
+        return tick - origin
+
+    def levels(self, side):
+        """NumPy view of one side's depth ladder (slot 0 is tick self.origin)"""
+        return np.frombuffer(self.depth[side])
+
+    def level(self, side, price):
+        slot = self.tick(price) - self.origin if self.origin is not None else -1
+        return self.depth[side][slot] if 0 <= slot < len(self.depth[side]) else 0.0
+
+    def bestBid(self):
+        return self.best[BID] * self.tickSize if self.best[BID] is not None else np.nan
+
+    def bestAsk(self):
+        return self.best[ASK] * self.tickSize if self.best[ASK] is not None else np.nan
+
+    def top(self, levels=5):
+        """(bid prices, bid sizes, ask prices, ask sizes) of the best `levels` non-empty levels"""
+        result = []
+        for side in (BID, ASK):
+            depth = self.levels(side)
+            nonzero = np.flatnonzero(depth)
+            chosen = nonzero[::-1][:levels] if side == BID else nonzero[:levels]
+            result += [(chosen + self.origin) * self.tickSize if len(chosen) else np.zeros(0), depth[chosen]]
+        return tuple(result)
+
+    def _setDepth(self, side, tick, slot, depth):
+        levels = self.depth[side]
+        levels[slot] = depth
+        best = self.best[side]
+        if depth > 0:
+            if best is None or (tick > best if side == BID else tick < best):
+                self.best[side] = tick
+        elif tick == best:
+            # The next level is nearly always a few ticks away; only scan the array when it isn't
+            step = -1 if side == BID else 1
+            for near in range(slot + step, slot + 9 * step, step):
+                if not 0 <= near < len(levels):
+                    break
+                if levels[near] > 0:
+                    self.best[side] = near + self.origin
+                    return
+            view = self.levels(side)
+            nonzero = np.flatnonzero(view[:slot] if side == BID else view[slot + 1:])
+            if len(nonzero) == 0:
+                self.best[side] = None
+            else:
+                self.best[side] = int(nonzero[-1] if side == BID else nonzero[0] + slot + 1) + self.origin
+
+    def submit(self, side, price, qty):
+        """
+        Place our limit order (Orders.BUY / Orders.SELL); returns its id
+
+        An order priced through the opposite best fills at once against the displayed depth there,
+        best level first and up to its limit, like a taker. The book itself is left as recorded.
+        Whatever is left rests at the back of its level.
+        """
+        orderId = self.nextId
+        self.nextId += 1
+        order = _Order(orderId, side, self.tick(price), qty, 0.0, self.sequence)
+        self.mine[orderId] = order
+        self._cross(order)
+        if orderId in self.mine:
+            order.ahead = self.level(order.level, price)
+        return orderId
+
+    def _cross(self, order):
+        opposite = ASK if order.level == BID else BID
+        best = self.best[opposite]
+        if best is None:
+            return
+        step = 1 if opposite == ASK else -1
+        depth = self.depth[opposite]
+        # Empty when the opposite best is beyond our limit
+        for tick in range(best, order.tick + step, step):
+            slot = tick - self.origin
+            if not 0 <= slot < len(depth):
+                break
+            if depth[slot] > 0:
+                self._fill(order, depth[slot], tick)
+                if order.id not in self.mine:
+                    return
+
+    def cancel(self, orderId):
+        return self.mine.pop(orderId, None) is not None
+
+    def position(self, orderId):
+        """Volume queued ahead of our order (None once it has filled or been cancelled)"""
+        order = self.mine.get(orderId)
+        return order.ahead if order is not None else None
+
+    def _fill(self, order, qty, tick):
+        qty = min(qty, order.remaining)
+        if qty <= 0:
+            return
+        order.remaining -= qty
+        self.fills.append((self.time, order.id, order.side, tick * self.tickSize, qty))
+        if order.remaining <= 1e-12:
+            del self.mine[order.id]
+
+    def _reduceAhead(self, order, qty, levelDepth, orderId):
+        if orderId >= 0:
+            known = self.l3.get(orderId)
+            if known is not None and known <= order.sequence:
+                order.ahead = max(0.0, order.ahead - qty)
+            return
+        if self.cancels == "proportional":
+            share = order.ahead / levelDepth if levelDepth > 0 else 0.0
+            order.ahead = max(0.0, order.ahead - qty * share)
+        else:
+            behind = max(0.0, levelDepth - order.ahead)
+            order.ahead = max(0.0, order.ahead - max(0.0, qty - behind))
+
+    def _traded(self, side, tick, qty):
+        for order in list(self.mine.values()):
+            if order.level != side:
+                continue
+            # A trade printing through our price means every order there was taken
+            through = tick < order.tick if side == BID else tick > order.tick
+            if through:
+                self._fill(order, order.remaining, order.tick)
+            elif tick == order.tick:
+                reach = qty - order.ahead
+                order.ahead = max(0.0, order.ahead - qty)
+                if reach > 0:
+                    self._fill(order, reach, tick)
+
+    def apply(self, time, kind, side, price, qty, orderId=-1):
+        """One book message; see the module constants"""
+        self._apply(time, kind, side, self.tick(price), qty, orderId)
+
+    def _apply(self, time, kind, side, tick, qty, orderId):
+        self.time = time
+        self.sequence += 1
+        slot = self._slot(tick)
+        current = self.depth[side][slot]
+        target = qty if kind == SET else None
+        if kind == SET:
+            change = qty - current
+            kind, qty = (ADD, change) if change >= 0 else (CANCEL, -change)
+            if qty == 0:
+                return
+        if orderId >= 0:
+            if kind == ADD:
+                self.l3[orderId] = self.sequence
+        if self.mine:
+            if kind == CANCEL:
+                for order in list(self.mine.values()):
+                    if order.level == side and order.tick == tick:
+                        self._reduceAhead(order, qty, current, orderId)
+            elif kind == TRADE:
+                self._traded(side, tick, qty)
+        if orderId >= 0 and kind == CANCEL:
+            self.l3.pop(orderId, None)
+        if target is not None:
+            # current + (target - current) can miss target by an ulp, leaving a phantom level
+            # once a trade of the full size takes it
+            self._setDepth(side, tick, slot, target)
+        elif kind == ADD:
+            self._setDepth(side, tick, slot, current + qty)
+        else:
+            self._setDepth(side, tick, slot, max(0.0, current - qty))
+
+    def replay(self, messages, until=None):
+        """
+        Apply a structured array of MESSAGE_DTYPE in order, optionally stopping before time
+        `until`; returns the number applied
+        """
+        times = messages["time"]
+        end = len(times) if until is None else int(np.searchsorted(times, until, side="left"))
+        ticks = np.rint(messages["price"][:end] / self.tickSize).astype(np.int64)
+        apply = self._apply
+        for message in zip(times[:end].tolist(), messages["kind"][:end].tolist(), messages["side"][:end].tolist(),
+                           ticks.tolist(), messages["qty"][:end].tolist(), messages["orderId"][:end].tolist()):
+            apply(*message)
+        return end
+
+    def fillFrame(self):
+        return pd.DataFrame(self.fills, columns=FILL_COLUMNS)
+
+
+def synthesize(data, tickSize=0.01, levels=5, depthShare=0.02, path="OHLC", lean=0.6, noise=0.5, seed=0):
+    """
+    L2 messages made up from bars, for when there is no recorded book
+
+    Each bar opens with `levels` price levels a side around its open, each holding depthShare of
+    the bar's volume. The price then walks the intrabar path (Orders.intrabarPath) one tick at
+    a time: each step sweeps the level it moves into with a TRADE, refills the level it left on
+    the other side and keeps both sides `levels` deep. Volume the sweeps didn't use trades at
+    the final best bid and ask, which are then refilled. Message times are spread evenly across
+    the bar.
+
+    At the close every resting level is resized so the book leans the way the bar moved: bids
+    hold depth * (1 + k) and asks depth * (1 - k), so the closing book's imbalance over all its
+    levels is k = lean * clip((close - open) / (high - low) + noise * N(0, 1), -1, 1). The noise
+    (seeded) keeps the imbalance from being a fixed function of the bar, as a real book's isn't.
+    lean=0 keeps the book flat.
+    """
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    times = (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
+    spacing = np.diff(times, append=times[-1] + (np.median(np.diff(times)) if len(times) > 1 else 60 * 10 ** 9))
+    columns = [data[c].to_numpy(dtype=np.float64) for c in ("Open", "High", "Low", "Close", "Volume")]
+    shocks = np.random.default_rng(seed).standard_normal(len(times)) * noise
+    messages = []
+    resting = {}
+    for row, (o, h, l, c, volume) in enumerate(zip(*columns)):
+        if np.isnan(o) or np.isnan(c):
+            continue
+        bar = []
+        depth = max(volume * depthShare, 1.0)
+        center = int(round(o / tickSize))
+        wanted = {(BID, center - k): depth for k in range(levels)}
+        wanted.update({(ASK, center + 1 + k): depth for k in range(levels)})
+        for key in set(resting) - set(wanted):
+            bar.append((SET, key[0], key[1], 0.0))
+        for key, size in wanted.items():
+            bar.append((SET, key[0], key[1], size))
+        resting = dict(wanted)
+
+        bid, swept = center, 0.0
+        for target in Orders.intrabarPath(o, h, l, c, path)[1:]:
+            goal = int(round(target / tickSize))
+            while bid + 1 <= goal:
+                # Lift the best ask; the level left behind becomes the new best bid and the far
+                # end of the asks is refilled so the book stays `levels` deep
+                size = resting.pop((ASK, bid + 1), 0.0)
+                bar.append((TRADE, ASK, bid + 1, size))
+                swept += size
+                bid += 1
+                for key in ((BID, bid), (ASK, bid + levels)):
+                    bar.append((SET, key[0], key[1], depth))
+                    resting[key] = depth
+                if resting.pop((BID, bid - levels), None) is not None:
+                    bar.append((SET, BID, bid - levels, 0.0))
+            while bid > goal:
+                size = resting.pop((BID, bid), 0.0)
+                bar.append((TRADE, BID, bid, size))
+                swept += size
+                for key in ((ASK, bid), (BID, bid - levels)):
+                    bar.append((SET, key[0], key[1], depth))
+                    resting[key] = depth
+                if resting.pop((ASK, bid + levels), None) is not None:
+                    bar.append((SET, ASK, bid + levels, 0.0))
+                bid -= 1
+        # The rest of the volume trades at the touch, which is refilled behind it
+        leftover = volume - swept
+        if leftover > 0:
+            bar.append((TRADE, BID, bid, leftover / 2))
+            bar.append((TRADE, ASK, bid + 1, leftover / 2))
+            resting[(BID, bid)] = resting[(ASK, bid + 1)] = depth
+        tilt = lean * min(1.0, max(-1.0, ((c - o) / (h - l) if h > l else 0.0) + shocks[row]))
+        for key in resting:
+            resting[key] = depth * (1 + tilt if key[0] == BID else 1 - tilt)
+            bar.append((SET, key[0], key[1], resting[key]))
+        step = spacing[row] // (len(bar) + 1)
+        for k, (kind, side, tick, qty) in enumerate(bar):
+            messages.append((times[row] + k * step, kind, side, tick * tickSize, qty, -1))
+    return np.array(messages, dtype=MESSAGE_DTYPE)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from DataScraping import ColumnarDataScraping
+    from PeggedOrders import PeggedOrders
+    from QueuePositioning import QueuePositioning
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "TSLA1.csv"
+    dataScraper = ColumnarDataScraping(path)
+    data = dataScraper.data
+    messages = synthesize(data)
+    print(f"{len(data)} bars -> {len(messages):,} book messages")
+
+    # Each bar, PeggedOrders' pegged bid and (when it signals) a QueuePositioning bid joining the
+    # best bid rest for the next bar. The bar-touch rule would fill the pegged bid whenever the
+    # next low reaches it; the book fills an order only once the queue ahead of it has traded.
+    pegged = PeggedOrders(dataScraper, data.index[1])
+    queued = QueuePositioning(dataScraper, data.index[1])
+    book = OrderBook()
+    index = pd.DatetimeIndex(data.index)
+    barTimes = (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
+    lows = data["Low"].to_numpy()
+    placed = {"pegged": [], "queue": []}
+    touched = 0
+    applied, resting = 0, []
+    begin = time.perf_counter()
+    for row in range(1, len(data) - 1):
+        # Everything up to the end of this bar, then swap last bar's bids for fresh ones
+        applied += book.replay(messages[applied:], until=barTimes[row + 1])
+        for orderId in resting:
+            book.cancel(orderId)
+        pegged.setDate(data.index[row])
+        queued.setDate(data.index[row])
+        limit = round(pegged.buyOrder()["limit"], 2)
+        resting = [book.submit(Orders.BUY, limit, 100)]
+        placed["pegged"].append(resting[0])
+        touched += lows[row + 1] <= limit
+        if queued.buy():
+            resting.append(book.submit(Orders.BUY, book.bestBid(), 100))
+            placed["queue"].append(resting[-1])
+    book.replay(messages[applied:], until=barTimes[-1])
+    elapsed = time.perf_counter() - begin
+
+    filled = book.fillFrame().groupby("order")["qty"].sum()
+    print(f"Replayed with the strategies' orders in {elapsed:.2f}s ({len(messages) / elapsed:,.0f} messages/s)")
+    for name, orderIds in placed.items():
+        done = filled.reindex(orderIds, fill_value=0)
+        print(f"{name:7s} bids: {len(orderIds):5d}  filled fully: {(done >= 100 - 1e-9).sum():5d}  "
+              f"partly: {((done > 0) & (done < 100 - 1e-9)).sum():5d}")
+    print(f"pegged bids the next bar's low touched: {touched}")
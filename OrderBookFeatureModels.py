@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class OrderBookFeatureModels:
     def __init__(self, dataScraper, date, lookback=10, depth_window=3):
         self.date = date
@@ -78,6 +81,12 @@ class OrderBookFeatureModels:
     
     def simulate_order_book_imbalance(self, end_index):
         """Simulate order book imbalance using price movement and volume"""
+        # Recorded snapshots give the real thing, already in [-1, 1]
+        book = getattr(self.dataScraper, "book", None)
+        if book is not None:
+            imbalance = book.imbalance()[end_index]
+            return 0.0 if imbalance != imbalance else float(imbalance)
+
         # In a real order book, imbalance would be (bid_volume - ask_volume) / (bid_volume + ask_volume)
         # We'll simulate this using recent price changes and volume
         
@@ -102,6 +111,15 @@ class OrderBookFeatureModels:
     
     def simulate_order_book_depth(self, end_index):
         """Simulate order book depth using volume relative to average"""
+        book = getattr(self.dataScraper, "book", None)
+        if book is not None:
+            # Resting size relative to its average over the lookback, scaled the same way
+            depth = book.totalDepth()
+            avg_depth = np.nanmean(depth[end_index - self.lookback + 1:end_index])
+            if not depth[end_index] >= 0 or not avg_depth > 0:
+                return 0.0
+            return min(3.0, depth[end_index] / avg_depth) / 3.0
+
         current_volume = float(self.dataScraper.getNumData(end_index, "Volume"))
         
         # Calculate average volume over lookback period
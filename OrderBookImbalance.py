@@ -11,6 +11,11 @@ class OrderBookImbalance:
         # Need enough data for the volume window
         if curr_index < self.volume_window:
             return False
+
+        # With recorded book snapshots attached, use the real depth imbalance
+        book = getattr(self.dataScraper, "book", None)
+        if book is not None:
+            return self.book_signal(book, curr_index, 1)
             
         # In a real order book imbalance strategy, we would analyze the order book depth
         # Since we don't have order book data, we'll simulate by using volume and price movement
@@ -53,6 +58,10 @@ class OrderBookImbalance:
         # Need enough data for the volume window
         if curr_index < self.volume_window:
             return False
+
+        book = getattr(self.dataScraper, "book", None)
+        if book is not None:
+            return self.book_signal(book, curr_index, -1)
             
         # Calculate volume-weighted price change over the window
         total_volume = 0
@@ -86,6 +95,16 @@ class OrderBookImbalance:
         return (sell_imbalance > self.imbalance_threshold and 
                 (prev_price - current_price) / prev_price < sell_imbalance / 2)
     
+    def book_signal(self, book, curr_index, direction):
+        """Same test as the proxy, on (bid - ask) / total resting size; direction 1 buys, -1 sells"""
+        imbalance = book.imbalance()[curr_index] * direction
+        if imbalance != imbalance:  # No snapshot for this bar
+            return False
+        current_price = float(self.dataScraper.getDateData(self.date, "Close"))
+        prev_price = float(self.dataScraper.getNumData(curr_index - 1, "Close"))
+        return (imbalance > self.imbalance_threshold and
+                direction * (current_price - prev_price) / prev_price < imbalance / 2)
+
     def setDate(self, date):
         self.date = date
     
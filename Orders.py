@@ -0,0 +1,170 @@
+import numpy as np
+
+MARKET = 0
+LIMIT = 1
+STOP = 2
+STOP_LIMIT = 3
+KINDS = {"market": MARKET, "limit": LIMIT, "stop": STOP, "stop_limit": STOP_LIMIT}
+
+BUY = 1
+SELL = -1
+
+# Order in which a bar's four prices are assumed to have traded
+PATHS = ("OHLC", "OLHC", "nearest")
+
+FILL_DTYPE = np.dtype([("id", np.int64), ("side", np.int8), ("price", np.float64), ("quantity", np.float64)])
+
+
+def intrabarPath(open, high, low, close, path="OHLC"):
+    """The bar as four price points: open, two extremes in assumed order, close"""
+    if path == "OHLC" or (path == "nearest" and abs(high - open) <= abs(open - low)):
+        return np.array([open, high, low, close], dtype=np.float64)
+    if path in PATHS:
+        return np.array([open, low, high, close], dtype=np.float64)
+    raise ValueError(f"Unknown intrabar path {path!r}, expected one of {PATHS}")
+
+
+def _firstTouch(touched):
+    """Index of the first touching segment per order, and whether any segment touched"""
+    return touched.argmax(axis=1), touched.any(axis=1)
+
+
+class RestingOrders:
+    def __init__(self, capacity=64, path="OHLC"):
+        """
+        Array-backed book of our resting orders, matched against each bar's OHLC all at once
+
+        path: "OHLC" (high before low), "OLHC" (low before high) or "nearest" (whichever extreme
+        is closer to the open first), deciding fills when both sides of a bar could trigger
+        """
+        self.path = path
+        self.count = 0
+        self.nextId = 0
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity):
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.side = np.zeros(capacity, dtype=np.int8)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.quantity = np.zeros(capacity, dtype=np.float64)
+        self.limit = np.full(capacity, np.nan)
+        self.stop = np.full(capacity, np.nan)
+        self.expiry = np.full(capacity, -1, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def _fields(self):
+        return ("ids", "side", "kind", "quantity", "limit", "stop", "expiry", "active")
+
+    def _compact(self):
+        """Drop inactive rows, doubling the arrays if the book is still full"""
+        keep = np.flatnonzero(self.active[:self.count])
+        capacity = len(self.ids) * (2 if len(keep) * 2 > len(self.ids) else 1)
+        old = {name: getattr(self, name)[keep] for name in self._fields()}
+        self._allocate(capacity)
+        for name, values in old.items():
+            getattr(self, name)[:len(keep)] = values
+        self.count = len(keep)
+
+    def submit(self, side, quantity, kind="market", limit=np.nan, stop=np.nan, expiry=-1):
+        """Queue an order; expiry is the last bar number it may fill on (-1 = good till cancelled)"""
+        kind = KINDS[kind] if isinstance(kind, str) else kind
+        if kind in (LIMIT, STOP_LIMIT) and np.isnan(limit):
+            raise ValueError("Limit orders need a limit price")
+        if kind in (STOP, STOP_LIMIT) and np.isnan(stop):
+            raise ValueError("Stop orders need a stop price")
+        if self.count == len(self.ids):
+            self._compact()
+        i = self.count
+        self.ids[i] = self.nextId
+        self.side[i] = side
+        self.kind[i] = kind
+        self.quantity[i] = quantity
+        self.limit[i] = limit
+        self.stop[i] = stop
+        self.expiry[i] = expiry
+        self.active[i] = True
+        self.count += 1
+        self.nextId += 1
+        return self.ids[i]
+
+    def cancel(self, orderId=None, side=None):
+        """Cancel one order by id, every order on one side, or everything"""
+        mask = self.active[:self.count].copy()
+        if orderId is not None:
+            mask &= self.ids[:self.count] == orderId
+        if side is not None:
+            mask &= self.side[:self.count] == side
+        self.active[:self.count][mask] = False
+
+    def pending(self, side=None):
+        mask = self.active[:self.count]
+        if side is not None:
+            mask = mask & (self.side[:self.count] == side)
+        return int(mask.sum())
+
+    def match(self, open, high, low, close, bar=None):
+        """Fill whatever the bar's price path reaches; returns a FILL_DTYPE array ordered by order id"""
+        rows = np.flatnonzero(self.active[:self.count])
+        if bar is not None:
+            expired = rows[(self.expiry[rows] >= 0) & (self.expiry[rows] < bar)]
+            self.active[expired] = False
+            rows = rows[(self.expiry[rows] < 0) | (self.expiry[rows] >= bar)]
+        if len(rows) == 0:
+            return np.zeros(0, dtype=FILL_DTYPE)
+
+        points = intrabarPath(open, high, low, close, self.path)
+        starts, ends = points[:-1], points[1:]
+        segLow, segHigh = np.minimum(starts, ends), np.maximum(starts, ends)
+        # Lowest / highest price still to come from the end of each segment onwards
+        suffixLow = np.minimum.accumulate(ends[::-1])[::-1]
+        suffixHigh = np.maximum.accumulate(ends[::-1])[::-1]
+
+        side, kind = self.side[rows], self.kind[rows]
+        limit, stop = self.limit[rows], self.stop[rows]
+        buy = side == BUY
+        filled = np.zeros(len(rows), dtype=bool)
+        price = np.full(len(rows), np.nan)
+
+        market = kind == MARKET
+        filled[market] = True
+        price[market] = open
+
+        # Stops: buy stops trigger when the path trades at or above the stop, sell stops at or below
+        stopTouched = np.where(buy[:, None], segHigh[None, :] >= stop[:, None], segLow[None, :] <= stop[:, None])
+        triggerSeg, triggered = _firstTouch(stopTouched)
+        # If the segment already starts through the stop (a gap), the trigger happens at its start
+        triggerPrice = np.where(buy, np.maximum(starts[triggerSeg], stop), np.minimum(starts[triggerSeg], stop))
+
+        plainStop = (kind == STOP) & triggered
+        filled[plainStop] = True
+        price[plainStop] = triggerPrice[plainStop]
+
+        # Limits: buy limits fill when the path trades at or below the limit, sell limits at or above
+        limitTouched = np.where(buy[:, None], segLow[None, :] <= limit[:, None], segHigh[None, :] >= limit[:, None])
+        limitSeg, limitHit = _firstTouch(limitTouched)
+        plainLimit = (kind == LIMIT) & limitHit
+        filled[plainLimit] = True
+        price[plainLimit] = np.where(buy, np.minimum(starts[limitSeg], limit),
+                                     np.maximum(starts[limitSeg], limit))[plainLimit]
+
+        # Stop-limits: once triggered, the rest of the path (from the trigger price on) must reach the limit
+        stopLimit = (kind == STOP_LIMIT) & triggered
+        restLow = np.minimum(triggerPrice, suffixLow[triggerSeg])
+        restHigh = np.maximum(triggerPrice, suffixHigh[triggerSeg])
+        reached = np.where(buy, restLow <= limit, restHigh >= limit)
+        stopLimitFill = stopLimit & reached
+        filled[stopLimitFill] = True
+        # Marketable at the trigger if the trigger price is already inside the limit
+        price[stopLimitFill] = np.where(buy, np.minimum(triggerPrice, limit),
+                                        np.maximum(triggerPrice, limit))[stopLimitFill]
+        # Triggered but not filled: it rests as a plain limit from now on
+        self.kind[rows[stopLimit & ~reached]] = LIMIT
+
+        fillRows = rows[filled]
+        self.active[fillRows] = False
+        fills = np.zeros(len(fillRows), dtype=FILL_DTYPE)
+        fills["id"] = self.ids[fillRows]
+        fills["side"] = self.side[fillRows]
+        fills["price"] = price[filled]
+        fills["quantity"] = self.quantity[fillRows]
+        return fills
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from BackTesting import BackTesting
+from DataScraping import LiveDataScraping
+from EventLog import EventLog
+from Optimizer import splitParams
+
+# What a strategy's queue does when it is full: "block" waits for room, which stops reading the
+# socket and so slows the server down; "skip" throws away the oldest waiting bar instead
+POLICIES = ("block", "skip")
+
+
+class ReplayServer:
+    def __init__(self, data, speed=0, host="127.0.0.1", port=0, unixPath=None):
+        """
+        Streams a Date-indexed frame of bars to every client that connects, as JSON lines
+
+        The first line is {"columns": [...]}, then one {"t": ns, "v": [...]} per bar and finally
+        {"end": true}. speed is how many times faster than the bars' own timestamps to send them
+        (0 sends as fast as the client reads). Each write waits for the socket to drain, so a
+        client that stops reading holds its stream back rather than filling memory.
+        """
+        self.data = data
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.unixPath = unixPath
+        self.columns = [c for c in data.columns if pd.api.types.is_numeric_dtype(data[c])]
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        self.times = (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
+        self.values = data[self.columns].to_numpy(dtype=np.float64)
+        self.server = None
+
+    async def start(self):
+        """Start listening; returns the address to connect to ((host, port) or the socket path)"""
+        if self.unixPath is not None:
+            self.server = await asyncio.start_unix_server(self._stream, path=self.unixPath)
+            return self.unixPath
+        self.server = await asyncio.start_server(self._stream, self.host, self.port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _stream(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            writer.write((json.dumps({"columns": self.columns}) + "\n").encode())
+            began = loop.time()
+            for row in range(len(self.times)):
+                if self.speed:
+                    due = began + (self.times[row] - self.times[0]) / 1e9 / self.speed
+                    if due > loop.time():
+                        await asyncio.sleep(due - loop.time())
+                line = {"t": int(self.times[row]), "v": [None if np.isnan(v) else v for v in self.values[row]]}
+                writer.write((json.dumps(line) + "\n").encode())
+                await writer.drain()
+            writer.write(b'{"end": true}\n')
+            await writer.drain()
+        except ConnectionError:
+            # The client went away; cancellation is left to propagate once the writer is closed
+            pass
+        finally:
+            writer.close()
+
+
+class StrategyRunner:
+    def __init__(self, name, backTesting, queueSize=64, policy="block"):
+        """
+        One strategy's consumer: takes bar rows off its own bounded queue and runs them through
+        BackTesting.update
+
+        Per bar it records the decision latency (bar received by the client -> buy/sell decided,
+        so time spent waiting behind other strategies counts) and the compute time of the update
+        alone.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.name = name
+        self.backTesting = backTesting
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize=queueSize)
+        self.latencyNs = []
+        self.computeNs = []
+        self.dropped = 0
+        self.failed = None
+
+    async def offer(self, row, arrived):
+        if self.policy == "skip" and self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        await self.queue.put((row, arrived))
+
+    async def consume(self):
+        dataScraper = self.backTesting.dataScraper
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            if self.failed is not None or self.backTesting.bankrupt():
+                continue
+            row, arrived = item
+            begin = time.perf_counter_ns()
+            try:
+                self.backTesting.update(dataScraper.getIndex(row))
+            except Exception as error:
+                # Keep draining so a broken strategy never blocks the feed for the others
+                self.failed = f"{type(error).__name__}: {error}"
+                continue
+            end = time.perf_counter_ns()
+            self.computeNs.append(end - begin)
+            self.latencyNs.append(end - arrived)
+            # Let the reader and the other strategies in between bars
+            await asyncio.sleep(0)
+
+    def summary(self):
+        latency = np.asarray(self.latencyNs, dtype=np.float64) / 1e3
+        compute = np.asarray(self.computeNs, dtype=np.float64) / 1e3
+        portfolio = self.backTesting.portfolio
+        return {
+            "strategy": self.name,
+            "bars": len(latency),
+            "dropped": self.dropped,
+            "finalValue": float(portfolio[-1]) if len(portfolio) else np.nan,
+            "latencyMeanUs": latency.mean() if len(latency) else np.nan,
+            "latencyP50Us": np.percentile(latency, 50) if len(latency) else np.nan,
+            "latencyP99Us": np.percentile(latency, 99) if len(latency) else np.nan,
+            "computeMeanUs": compute.mean() if len(compute) else np.nan,
+            "computeP99Us": np.percentile(compute, 99) if len(compute) else np.nan,
+            "error": self.failed,
+        }
+
+
+async def _connect(address):
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+
+async def paperTrade(address, strategyClasses, params=None, amount=1000, start=1, queueSize=64, policy="block"):
+    """
+    Subscribe to a replay server and run every strategy on the bars as they arrive, on this loop
+
+    Strategies are built once bar `start` has arrived (they see only the bars received so far)
+    and decide on every bar from `start` on. Returns (runners, dataScraper); StrategyRunner.summary
+    has the per-strategy latency figures.
+    """
+    strategyParams, risk = splitParams(params or {})
+    reader, writer = await _connect(address)
+    header = json.loads(await reader.readline())
+    dataScraper = LiveDataScraping(header["columns"])
+    runners, tasks = [], []
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            arrived = time.perf_counter_ns()
+            message = json.loads(line)
+            if message.get("end"):
+                break
+            values = [np.nan if v is None else v for v in message["v"]]
+            row = dataScraper.append(message["t"], dict(zip(header["columns"], values)))
+            if row < start:
+                continue
+            if row == start:
+                date = dataScraper.getIndex(start)
+                for strategyClass in strategyClasses:
+                    strategy = strategyClass(dataScraper, date, **strategyParams)
+                    backTesting = BackTesting(strategy, amount, dataScraper, 0, date, .9 * amount, risk["extraCosts"],
+                                              risk["drawDown"], risk["drawUp"], EventLog.quiet())
+                    runner = StrategyRunner(strategyClass.__name__, backTesting, queueSize, policy)
+                    runners.append(runner)
+                    tasks.append(asyncio.create_task(runner.consume()))
+            for runner in runners:
+                await runner.offer(row, arrived)
+    finally:
+        writer.close()
+        for runner in runners:
+            await runner.queue.put(None)
+        await asyncio.gather(*tasks)
+    return runners, dataScraper
+
+
+async def _serveAndTrade(data, strategyClasses, speed, unixPath, **kwargs):
+    server = ReplayServer(data, speed, unixPath=unixPath)
+    address = await server.start()
+    try:
+        return await paperTrade(address, strategyClasses, **kwargs)
+    finally:
+        await server.close()
+
+
+def run(data, strategyClasses, speed=0, unixPath=None, **kwargs):
+    """Replay a frame through an in-process server and paper-trade it; returns a summary frame"""
+    runners, _ = asyncio.run(_serveAndTrade(data, strategyClasses, speed, unixPath, **kwargs))
+    return pd.DataFrame([runner.summary() for runner in runners])
+
+
+async def serve(data, speed=0, host="127.0.0.1", port=8765, unixPath=None):
+    server = ReplayServer(data, speed, host, port, unixPath)
+    address = await server.start()
+    print(f"Replaying {len(data)} bars on {address} at {speed or 'full'}x speed")
+    async with server.server:
+        await server.server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+    from CLI import loadData
+
+    parser = argparse.ArgumentParser(description="Replay quote CSVs to paper-trading clients (CLI.py paper)")
+    parser.add_argument("--data", nargs="+", required=True)
+    parser.add_argument("--speed", type=float, default=0, help="Multiple of real time; 0 sends as fast as read")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead of TCP")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(loadData(args.data).data, args.speed, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
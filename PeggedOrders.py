@@ -23,7 +23,7 @@ class PeggedOrders:
         estimated_spread = (high_price - low_price) / low_price
         
         # Calculate midpoint
-        midpoint = (high_price + low_price) / 2
+        midpoint = self._midpoint()
         
         # Calculate our buy price (midpoint - offset)
         buy_price = midpoint * (1 - self.peg_offset)
@@ -55,7 +55,7 @@ class PeggedOrders:
         estimated_spread = (high_price - low_price) / low_price
         
         # Calculate midpoint
-        midpoint = (high_price + low_price) / 2
+        midpoint = self._midpoint()
         
         # Calculate our sell price (midpoint + offset)
         sell_price = midpoint * (1 + self.peg_offset)
@@ -72,6 +72,20 @@ class PeggedOrders:
                 current_price >= sell_price and
                 current_price > prev_close)  # Upward momentum
     
+    def buyOrder(self):
+        """Rest the pegged bid as a limit order for the next bar instead of filling at the close"""
+        return {"kind": "limit", "limit": self._midpoint() * (1 - self.peg_offset)}
+    
+    def sellOrder(self):
+        """Rest the pegged offer as a limit order for the next bar"""
+        return {"kind": "limit", "limit": self._midpoint() * (1 + self.peg_offset)}
+    
+    def _midpoint(self):
+        """High/Low midpoint of the current bar, which both the signals and the resting orders peg to"""
+        high_price = float(self.dataScraper.getDateData(self.date, "High"))
+        low_price = float(self.dataScraper.getDateData(self.date, "Low"))
+        return (high_price + low_price) / 2
+    
     def setDate(self, date):
         self.date = date
     
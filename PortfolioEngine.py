@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+import Metrics
+from EventLog import EventLog
+
+
+class Panel:
+    def __init__(self, scrapers, column="Close"):
+        """
+        Aligns several single-instrument datasets on one clock
+
+        scrapers: {symbol: DataScraping}; the clock is the union of their timestamps
+        """
+        self.symbols = list(scrapers)
+        self.scrapers = [scrapers[s] for s in self.symbols]
+        frame = pd.concat([s.data[column].rename(sym) for sym, s in zip(self.symbols, self.scrapers)],
+                          axis=1, sort=True)
+        self.index = frame.index
+        # has[t, n]: instrument n printed a bar at time t, so its strategies are asked for signals
+        self.has = frame.notna().to_numpy()
+        # Last traded price carried forward for marking positions between an instrument's bars;
+        # zero before an instrument's first bar, where nothing can be held yet
+        self.prices = frame.ffill().fillna(0).to_numpy(dtype=np.float64)
+        # rows[t, n]: instrument n's own row for its latest bar at or before t (-1 before its first bar)
+        self.rows = np.maximum.accumulate(np.where(self.has, np.cumsum(self.has, axis=0) - 1, -1), axis=0)
+
+    def stack(self, perInstrument):
+        """Lay per-instrument row arrays out on the panel clock as a (bars, instruments) matrix"""
+        out = np.zeros(self.rows.shape)
+        for n, values in enumerate(perInstrument):
+            valid = self.rows[:, n] >= 0
+            out[valid, n] = np.asarray(values)[self.rows[valid, n]]
+        return out
+
+    def column(self, symbol):
+        return self.symbols.index(symbol)
+
+
+class PortfolioEngine:
+    def __init__(self, scrapers, amount=10000, extraCosts=0, drawDown=None, drawUp=None, log=None, costModel=None):
+        """
+        Runs a book of strategies over several instruments in one pass
+
+        Parameters:
+        scrapers: {symbol: DataScraping} panel, e.g. {"SPY": DataScraping("SPY2.csv"), ...}
+        amount: Starting cash, split across the book by weight
+        extraCosts: Cost as a fraction of the traded notional, charged on each instrument's net order
+        drawDown / drawUp: Optional per-strategy stop, as in BackTesting, against the previous bar's sleeve value
+        log: EventLog for fills and stops (quiet by default)
+        costModel: Optional CostModels model, evaluated per instrument on the net order
+        """
+        self.panel = Panel(scrapers)
+        self.amount = amount
+        self.extraCosts = extraCosts
+        self.drawDown = drawDown
+        self.drawUp = drawUp
+        self.log = log if log is not None else EventLog.quiet()
+        self.costModel = costModel
+        self.book = []
+
+    def add(self, symbol, strategyClass, weight=1.0, **params):
+        """Add a strategy trading one instrument; weight sets its share of the starting cash"""
+        self.book.append({"symbol": symbol, "instrument": self.panel.column(symbol),
+                          "strategyClass": strategyClass, "weight": weight, "params": params})
+        return self
+
+    def run(self):
+        panel = self.panel
+        bars, instruments, sleeves = len(panel.index), len(panel.symbols), len(self.book)
+        instrument = np.array([entry["instrument"] for entry in self.book], dtype=np.intp)
+        weights = np.array([entry["weight"] for entry in self.book], dtype=np.float64)
+
+        # Per-sleeve state; instrument totals are reduced from these with bincount
+        sleeveCash = self.amount * weights / weights.sum()
+        sleeveShares = np.zeros(sleeves)
+        previousEquity = sleeveCash.copy()
+
+        self.sleeveEquity = np.zeros((bars, sleeves))
+        self.positions = np.zeros((bars, instruments))
+        self.cash = np.zeros(bars)
+        self.equity = np.zeros(bars)
+        fills = []
+
+        strategies = []
+        for entry in self.book:
+            scraper = panel.scrapers[entry["instrument"]]
+            strategies.append(entry["strategyClass"](scraper, scraper.getIndex(0), **entry["params"]))
+        bySymbol = [np.flatnonzero(instrument == n) for n in range(instruments)]
+
+        # Cost model arrays for the whole run, aligned to the panel clock
+        costBase = np.full((bars, instruments), float(self.extraCosts))
+        costImpact = np.zeros((bars, instruments))
+        if self.costModel is not None:
+            prepared = [self.costModel.prepare(scraper.data) for scraper in panel.scrapers]
+            costBase += panel.stack([p.base for p in prepared])
+            costImpact = panel.stack([p.impact for p in prepared])
+
+        for t in range(bars):
+            date = panel.index[t]
+            prices = panel.prices[t]
+            delta = np.zeros(sleeves)
+
+            for n in np.flatnonzero(panel.has[t]):
+                scraper = panel.scrapers[n]
+                # The first bar has no history for strategies to look back on
+                if scraper.getRow(date) < 1:
+                    continue
+                for k in bySymbol[n]:
+                    strategy = strategies[k]
+                    strategy.setDate(date)
+                    buy = strategy.buy()
+                    sell = strategy.sell()
+                    if buy and sleeveCash[k] > 0:
+                        delta[k] += .9 * sleeveCash[k] / prices[n]
+                    if sell and sleeveShares[k] + delta[k] > 0:
+                        delta[k] = -sleeveShares[k]
+
+            if self.drawDown is not None or self.drawUp is not None:
+                marked = sleeveCash + sleeveShares * prices[instrument]
+                stop = np.zeros(sleeves, dtype=bool)
+                if self.drawDown is not None:
+                    stop |= marked < (1 - self.drawDown) * previousEquity
+                if self.drawUp is not None:
+                    stop |= marked > (1 + self.drawUp) * previousEquity
+                stop &= sleeveShares > 0
+                for k in np.flatnonzero(stop):
+                    self.log.info("stop", date, symbol=self.book[k]["symbol"],
+                                  strategy=self.book[k]["strategyClass"].__name__)
+                delta[stop] = -sleeveShares[stop]
+
+            if delta.any():
+                # Net the book's orders per instrument; only the net crosses the market and pays costs
+                net = np.bincount(instrument, weights=delta, minlength=instruments)
+                gross = np.bincount(instrument, weights=np.abs(delta), minlength=instruments)
+                cost = np.abs(net) * prices * (costBase[t] + costImpact[t] * np.sqrt(np.abs(net)))
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    share = np.where(gross[instrument] > 0, np.abs(delta) / gross[instrument], 0)
+                sleeveCash -= delta * prices[instrument] + share * cost[instrument]
+                sleeveShares += delta
+                for n in np.flatnonzero(net):
+                    fills.append((date, panel.symbols[n], prices[n], net[n], cost[n]))
+                    self.log.info("fill", date, symbol=panel.symbols[n], price=prices[n], shares=net[n])
+
+            previousEquity = sleeveCash + sleeveShares * prices[instrument]
+            self.sleeveEquity[t] = previousEquity
+            self.positions[t] = np.bincount(instrument, weights=sleeveShares, minlength=instruments)
+            self.cash[t] = sleeveCash.sum()
+            self.equity[t] = previousEquity.sum()
+
+        self.fills = pd.DataFrame(fills, columns=["Date", "Symbol", "Price", "Shares", "Cost"])
+        self.log.flush()
+        return self.equity
+
+    def summary(self):
+        """Metrics per strategy sleeve plus the whole book"""
+        names = [f'{e["strategyClass"].__name__}:{e["symbol"]}' for e in self.book]
+        results = [{"name": name, "portfolio": self.sleeveEquity[:, k]} for k, name in enumerate(names)]
+        results.append({"name": "Book", "portfolio": self.equity})
+        return Metrics.table(results, index=self.panel.index)
+
+
+if __name__ == "__main__":
+    from DataScraping import DataScraping
+    from RSI_Strategy import RSI_Strategy
+    from MeanReversion import MeanReversion
+    from SMACross import SMA_Cross
+
+    files = {"SPY": "SPY2.csv", "AAPL": "AAPLStockQuotesAug2025.csv", "NVDA": "NVDAStockQuotes2.csv",
+             "TSLA": "TSLA1.csv", "WULF": "WULFStockQuotes2.csv"}
+    engine = PortfolioEngine({symbol: DataScraping(path) for symbol, path in files.items()}, extraCosts=.0005)
+    for symbol in files:
+        engine.add(symbol, RSI_Strategy)
+        engine.add(symbol, MeanReversion)
+        engine.add(symbol, SMA_Cross, weight=.5)
+    engine.run()
+    print(engine.summary().to_string(index=False, float_format='%.4f'))
+    print(engine.fills.tail())
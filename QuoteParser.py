@@ -0,0 +1,122 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# The exact header every bundled quote file carries; anything else goes through pandas instead
+HEADER = b'"Date","Open","High","Low","Close","% Change","% Change vs Average","Volume"'
+COLUMNS = ["Open", "High", "Low", "Close", "% Change", "% Change vs Average", "Volume"]
+# Byte offsets inside a line: '"' + 2025-07-10T08:00:00.000Z + '",' then the quoted numbers
+DATE_START = 1
+DATE_LENGTH = 24
+NUMBERS_START = DATE_START + DATE_LENGTH + 2
+DATE_PUNCTUATION = {4: b"-", 7: b"-", 10: b"T", 13: b":", 16: b":", 19: b".", 23: b"Z", 24: b'"', 25: b","}
+
+NEWLINE, SPACE = ord("\n"), ord(" ")
+WHITESPACE = bytes.maketrans(b'"\r\n', b"   ")
+
+
+def _daysFromCivil(year, month, day):
+    """Days since 1970-01-01 for proleptic Gregorian dates, vectorized (H. Hinnant's algorithm)"""
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    yearOfEra = year - era * 400
+    dayOfYear = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    dayOfEra = yearOfEra * 365 + yearOfEra // 4 - yearOfEra // 100 + dayOfYear
+    return era * 146097 + dayOfEra - 719468
+
+
+def parseTimestamps(dates):
+    """(rows, 24) uint8 array of 'YYYY-MM-DDTHH:MM:SS.fffZ' -> int64 nanoseconds since the epoch (UTC)"""
+    digits = dates.astype(np.int64) - ord("0")
+
+    def number(start, width):
+        value = np.zeros(len(digits), dtype=np.int64)
+        for k in range(start, start + width):
+            value = value * 10 + digits[:, k]
+        return value
+
+    days = _daysFromCivil(number(0, 4), number(5, 2), number(8, 2))
+    seconds = days * 86400 + number(11, 2) * 3600 + number(14, 2) * 60 + number(17, 2)
+    return seconds * 10 ** 9 + number(20, 3) * 10 ** 6
+
+
+def parse(raw):
+    """
+    Parse the bytes of a quote file in the bundled schema into (int64 UTC nanoseconds, (rows, 7) floats)
+
+    Returns None when the bytes don't follow the schema exactly (different header, other date
+    formats, text in a numeric field...), so callers can fall back to a general CSV reader.
+    """
+    headerEnd = raw.find(b"\n")
+    if headerEnd < 0 or raw[:headerEnd].rstrip(b"\r") != HEADER:
+        return None
+    # Two quotes only ever meet in an empty field, which pandas reads as NaN
+    body = np.frombuffer(raw[headerEnd + 1:].rstrip(b"\r\n").replace(b'""', b'"nan"'), dtype=np.uint8).copy()
+    if len(body) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(COLUMNS)))
+    lineEnds = np.flatnonzero(body == NEWLINE)
+    starts = np.concatenate(([0], lineEnds + 1))
+    ends = np.concatenate((lineEnds, [len(body)]))
+    if (ends - starts < NUMBERS_START).any():
+        return None
+
+    for offset, char in DATE_PUNCTUATION.items():
+        if (body[starts + DATE_START + offset] != ord(char)).any():
+            return None
+    dateBytes = starts[:, None] + np.arange(NUMBERS_START)
+    times = parseTimestamps(body[dateBytes[:, DATE_START:DATE_START + DATE_LENGTH]])
+
+    # With the dates blanked, '","' separates fields, quotes and line breaks are whitespace and the
+    # commas left over can only be thousands separators
+    body[dateBytes] = SPACE
+    text = body.tobytes().replace(b'","', b" ").translate(WHITESPACE, b",")
+    with warnings.catch_warnings():
+        # fromstring stops at the first token that isn't a number and only warns about it
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(text, dtype=np.float64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            return None
+    if len(values) != len(starts) * len(COLUMNS):
+        return None
+    return times, values.reshape(len(starts), len(COLUMNS))
+
+
+def read(path):
+    """A quote file as DataScraping's Date-indexed frame, or None if it isn't in the bundled schema"""
+    with open(path, "rb") as f:
+        parsed = parse(f.read())
+    if parsed is None:
+        return None
+    times, values = parsed
+    index = pd.DatetimeIndex(times.view("datetime64[ns]"), name="Date").tz_localize("UTC")
+    return pd.DataFrame(values, index=index, columns=COLUMNS)
+
+
+if __name__ == "__main__":
+    import glob
+    import os
+    import tempfile
+    import time
+    import SyntheticData
+    from DataScraping import DataScraping
+
+    def pandasLoad(path):
+        return DataScraping.clean(pd.read_csv(path, parse_dates=["Date"]))
+
+    big = os.path.join(tempfile.mkdtemp(), "Synthetic1M.csv")
+    SyntheticData.toCsv(SyntheticData.generate(1_000_000, seed=4), big)
+    rows = []
+    for path in sorted(glob.glob("*.csv")) + [big]:
+        begin = time.perf_counter()
+        expected = pandasLoad(path)
+        slow = time.perf_counter() - begin
+        begin = time.perf_counter()
+        actual = read(path)
+        fast = time.perf_counter() - begin
+        same = actual is not None and (actual.index == expected.index).all() and \
+            np.array_equal(actual.to_numpy(), expected[COLUMNS].to_numpy(dtype=np.float64), equal_nan=True)
+        rows.append({"file": os.path.basename(path), "rows": len(expected), "pandasMs": slow * 1e3,
+                     "parserMs": fast * 1e3, "speedup": slow / fast, "identical": same})
+    print(pd.DataFrame(rows).to_string(index=False, float_format="%.2f"))
@@ -0,0 +1,147 @@
+import os
+import glob
+import random
+import tempfile
+import numpy as np
+import pandas as pd
+from BackTesting import BackTesting
+from DataScraping import DataScraping, ColumnarDataScraping
+from EventLog import EventLog
+import Strategies
+
+# Per-bar ledger fields compared between the reference loop and an accelerated path
+FIELDS = ("time", "action", "shares", "cash", "price", "equity")
+
+
+def _seed(seed):
+    # Several strategies draw from the global generators; reseed so both runs see the same draws
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def _backTesting(strategyClass, dataScraper, params, amount, start):
+    date = dataScraper.getIndex(start)
+    strategy = strategyClass(dataScraper, date, **params)
+    return BackTesting(strategy, amount, dataScraper, 0, date, .9 * amount, 0, .02, .50, EventLog.quiet())
+
+
+def runLoop(strategyClass, data, params, amount=1000, start=1, end=None):
+    """Reference path: BackTesting.update over pandas-indexed DataScraping"""
+    backTesting = _backTesting(strategyClass, DataScraping.fromData(data.copy()), params, amount, start)
+    backTesting.run(start, end)
+    return backTesting
+
+
+def runColumnar(strategyClass, data, params, amount=1000, start=1, end=None):
+    """Same loop with strategy and engine lookups answered from NumPy columns"""
+    backTesting = _backTesting(strategyClass, ColumnarDataScraping.fromData(data.copy()), params, amount, start)
+    backTesting.run(start, end)
+    return backTesting
+
+
+def runResumed(strategyClass, data, params, amount=1000, start=1, end=None):
+    """Run half the bars, checkpoint, then finish from BackTesting.resume"""
+    dataScraper = DataScraping.fromData(data.copy())
+    end = len(data) if end is None else end
+    backTesting = _backTesting(strategyClass, dataScraper, params, amount, start)
+    handle, path = tempfile.mkstemp(suffix=".ckpt")
+    os.close(handle)
+    try:
+        backTesting.run(start, start + (end - start) // 2, checkpointPath=path)
+        backTesting, nextRow = BackTesting.resume(path, dataScraper, EventLog.quiet())
+    finally:
+        os.remove(path)
+    backTesting.run(nextRow, end)
+    return backTesting
+
+
+PATHS = {"columnar": runColumnar, "resumed": runResumed}
+
+
+def firstDivergence(expected, actual, fields=FIELDS, tolerance=0.0):
+    """
+    First bar at which two BAR_DTYPE ledgers disagree, or None when they match
+
+    Float fields compare within tolerance (absolute), everything else exactly. A length
+    mismatch (e.g. one run went bankrupt earlier) diverges at the first missing bar.
+    """
+    bars = min(len(expected), len(actual))
+    first = None
+    for field in fields:
+        a, b = expected[field][:bars], actual[field][:bars]
+        if tolerance and a.dtype.kind == "f":
+            differs = ~np.isclose(a, b, rtol=0, atol=tolerance, equal_nan=True)
+        else:
+            differs = a != b
+            if a.dtype.kind == "f":
+                differs &= ~(np.isnan(a) & np.isnan(b))
+        hits = np.flatnonzero(differs)
+        if len(hits) and (first is None or hits[0] < first["bar"]):
+            first = {"bar": int(hits[0]), "field": field, "expected": a[hits[0]], "actual": b[hits[0]]}
+    if first is None and len(expected) != len(actual):
+        first = {"bar": bars, "field": "length", "expected": len(expected), "actual": len(actual)}
+    if first is not None:
+        times = expected["time"] if first["bar"] < len(expected) else actual["time"]
+        first["date"] = pd.Timestamp(times[first["bar"]]) if first["bar"] < len(times) else None
+    return first
+
+
+def replay(strategyClass, data, path="columnar", params=None, seed=0, tolerance=0.0, amount=1000, start=1, end=None):
+    """
+    Run one strategy through the reference loop and an accelerated path on the same data
+
+    path: Name in PATHS or a callable with runLoop's signature
+    Returns {"bars", "divergence", "expected", "actual"}; divergence is None when the ledgers match
+    """
+    params = params or {}
+    end = len(data) if end is None else min(end, len(data))
+    accelerated = PATHS[path] if isinstance(path, str) else path
+    _seed(seed)
+    expected = runLoop(strategyClass, data, params, amount, start, end).ledger
+    _seed(seed)
+    actual = accelerated(strategyClass, data, params, amount, start, end).ledger
+    return {"bars": expected.count, "divergence": firstDivergence(expected.bars, actual.bars, tolerance=tolerance),
+            "expected": expected, "actual": actual}
+
+
+def regressionSuite(csvPaths, strategyClasses=None, paths=tuple(PATHS), end=None, tolerance=0.0):
+    """
+    Replay every strategy over every dataset through every path
+
+    strategyClasses defaults to BatchTest's list (whatever imports here). Returns one row per
+    (strategy, dataset, path) with status "match", "diverged" or "error".
+    """
+    if strategyClasses is None:
+        strategyClasses, skipped = Strategies.load()
+        for name, error in skipped.items():
+            print(f"Skipping {name}: {error}")
+    rows = []
+    for csvPath in csvPaths:
+        data = DataScraping(csvPath).data
+        for strategyClass in strategyClasses:
+            for path in paths:
+                row = {"strategy": strategyClass.__name__, "dataset": os.path.basename(csvPath), "path": path}
+                try:
+                    result = replay(strategyClass, data, path, end=end, tolerance=tolerance)
+                except Exception as e:
+                    row.update(status="error", error=f"{type(e).__name__}: {e}")
+                    rows.append(row)
+                    continue
+                divergence = result["divergence"]
+                row.update(status="match" if divergence is None else "diverged", bars=result["bars"])
+                if divergence is not None:
+                    row.update(divergence)
+                rows.append(row)
+    columns = ["strategy", "dataset", "path", "status", "bars", "bar", "date", "field", "expected", "actual", "error"]
+    return pd.DataFrame(rows).reindex(columns=columns)
+
+
+if __name__ == "__main__":
+    import sys
+
+    csvPaths = sys.argv[1:] or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.csv")))
+    report = regressionSuite(csvPaths)
+    print(report.to_string(index=False))
+    failed = report[report["status"] != "match"]
+    print(f"\n{len(report) - len(failed)}/{len(report)} replays match")
+    sys.exit(1 if len(failed) else 0)
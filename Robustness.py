@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import Metrics
+from Ledger import NOTHING, BUY, SELL
+
+BOOTSTRAP_METRICS = ("totalReturn", "sharpe", "maxDrawdown")
+# A permutation keeps the trades' product, mean and spread, so only the path statistics can move
+SHUFFLE_METRICS = ("maxDrawdown", "drawdownDuration")
+
+
+def barReturns(portfolio):
+    """Per-bar simple returns of a portfolio value series"""
+    values = np.asarray(portfolio, dtype=float)
+    return values[1:] / values[:-1] - 1
+
+
+def tradeReturns(backTesting):
+    """Return of each round trip (Buy bar to the following Sell bar) from a finished BackTesting run"""
+    bars = backTesting.ledger.bars
+    values = bars["equity"]
+    trades = []
+    entry = None
+    for i in np.flatnonzero(bars["action"] != NOTHING):
+        if bars["action"][i] == BUY and entry is None:
+            entry = values[i]
+        elif bars["action"][i] == SELL and entry is not None:
+            trades.append(values[i] / entry - 1)
+            entry = None
+    return np.asarray(trades, dtype=float)
+
+
+def blockBootstrap(returns, samples, blockSize, rng):
+    """(samples, len(returns)) matrix of circular block-bootstrap resamples built with one fancy index"""
+    n = len(returns)
+    blocks = -(-n // blockSize)
+    starts = rng.integers(0, n, size=(samples, blocks))
+    offsets = np.arange(blockSize)
+    index = (starts[:, :, None] + offsets[None, None, :]).reshape(samples, -1)[:, :n] % n
+    return returns[index]
+
+
+def tradeShuffle(trades, samples, rng):
+    """(samples, len(trades)) matrix of random permutations of the trade returns"""
+    order = np.argsort(rng.random((samples, len(trades))), axis=1)
+    return trades[order]
+
+
+def pathMetrics(returns, periodsPerYear, names=BOOTSTRAP_METRICS):
+    """The Metrics.summary values in names for every row of a returns matrix"""
+    # Prepend the starting value so drawdowns are measured from it as well
+    equity = np.cumprod(np.hstack([np.ones((len(returns), 1)), 1 + returns]), axis=1)
+    metrics = Metrics.summary(equity, periodsPerYear=periodsPerYear)
+    return {name: metrics[name] for name in names}
+
+
+def _simulate(kind, data, samples, blockSize, periodsPerYear, seed, chunkSize):
+    rng = np.random.default_rng(seed)
+    names = BOOTSTRAP_METRICS if kind == "bootstrap" else SHUFFLE_METRICS
+    parts = {name: [] for name in names}
+    # Chunking bounds the resample matrix at chunkSize x len(data) floats
+    for begin in range(0, samples, chunkSize):
+        count = min(chunkSize, samples - begin)
+        if kind == "bootstrap":
+            matrix = blockBootstrap(data, count, blockSize, rng)
+        else:
+            matrix = tradeShuffle(data, count, rng)
+        for name, values in pathMetrics(matrix, periodsPerYear, names).items():
+            parts[name].append(values)
+    return {name: np.concatenate(values) for name, values in parts.items()}
+
+
+class Robustness:
+    def __init__(self, returns, trades=None, periodsPerYear=252, seed=None, workers=1, chunkSize=1000):
+        """
+        Monte Carlo confidence intervals for a finished run
+
+        Parameters:
+        returns: Per-bar returns, e.g. barReturns(backTesting.portfolio)
+        trades: Per-trade returns, e.g. tradeReturns(backTesting)
+        periodsPerYear: Bars per year used to annualise Sharpe, e.g. Metrics.barsPerYear(index)
+        seed: Seed for reproducible resamples
+        workers: Processes to split large resample counts across
+        chunkSize: Resamples materialised at once per process
+        """
+        self.returns = np.asarray(returns, dtype=float)
+        self.trades = np.asarray(trades, dtype=float) if trades is not None else None
+        self.periodsPerYear = periodsPerYear
+        self.seed = seed
+        self.workers = workers
+        self.chunkSize = chunkSize
+
+    def bootstrap(self, samples=5000, blockSize=20):
+        """Resample bar returns in blocks, preserving short-range autocorrelation"""
+        return self._run("bootstrap", self.returns, samples, blockSize)
+
+    def shuffleTrades(self, samples=5000):
+        """
+        Reorder the trade sequence. Total return and Sharpe don't depend on the order, so only max
+        drawdown and the longest drawdown (in trades) are reported
+        """
+        if self.trades is None or len(self.trades) < 2:
+            raise ValueError("At least two trades are needed to shuffle")
+        # Trades aren't bars, so nothing here is annualised
+        return self._run("shuffle", self.trades, samples, None, periodsPerYear=1)
+
+    def _run(self, kind, data, samples, blockSize, periodsPerYear=None):
+        periodsPerYear = self.periodsPerYear if periodsPerYear is None else periodsPerYear
+        if len(data) < 2:
+            raise ValueError("At least two returns are needed to resample")
+        workers = max(1, min(self.workers, samples // self.chunkSize or 1))
+        seeds = np.random.SeedSequence(self.seed).spawn(workers)
+        shares = [samples // workers + (1 if i < samples % workers else 0) for i in range(workers)]
+        args = [(kind, data, share, blockSize, periodsPerYear, s, self.chunkSize) for share, s in zip(shares, seeds)]
+        if workers == 1:
+            results = [_simulate(*args[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_simulate, *zip(*args)))
+        return {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+
+    @staticmethod
+    def confidenceIntervals(simulated, levels=(0.05, 0.5, 0.95)):
+        """Percentile table with one row per metric"""
+        table = {name: np.nanquantile(values, levels) for name, values in simulated.items()}
+        return pd.DataFrame(table, index=[f"{level:.0%}" for level in levels]).T
+
+    def report(self, samples=5000, blockSize=20, levels=(0.05, 0.5, 0.95)):
+        """Print the bootstrap (and, when trades are known, trade-shuffle) intervals"""
+        print(f"==== Block Bootstrap ({samples} resamples, block {blockSize}) ====")
+        print(self.confidenceIntervals(self.bootstrap(samples, blockSize), levels).to_string(float_format='%.4f'))
+        if self.trades is not None and len(self.trades) >= 2:
+            print(f"==== Trade Shuffle ({samples} resamples, {len(self.trades)} trades) ====")
+            print(self.confidenceIntervals(self.shuffleTrades(samples), levels).to_string(float_format='%.4f'))
+        print("=====================================")
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+PRE = 0
+REGULAR = 1
+POST = 2
+PHASE_LABELS = np.array(["pre", "regular", "post"])
+
+
+def _minutes(clock):
+    hours, minutes = clock.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class SessionIndex:
+    def __init__(self, index, timezone="America/New_York", regularOpen="09:30", regularClose="16:00"):
+        """
+        Per-bar trading-session lookups, computed once with vectorized passes over the index
+
+        Sessions are exchange-local calendar days, so the pre-market from 04:00 and the post-market
+        to 20:00 belong to the same session as the regular hours between them. Naive timestamps are
+        taken as UTC, which is what the bundled CSVs hold.
+
+        Per bar: session (id), phase (PRE/REGULAR/POST), minuteOfSession (minutes since the regular
+        open, negative before it). Per session: first/last row and regular open/close rows (-1 when
+        the session has no regular bars).
+        """
+        index = pd.DatetimeIndex(index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        local = index.tz_convert(timezone)
+        self.timezone = timezone
+        self.openMinute = _minutes(regularOpen)
+        self.closeMinute = _minutes(regularClose)
+        rows = len(index)
+
+        clock = np.asarray(local.hour, dtype=np.int64) * 60 + np.asarray(local.minute, dtype=np.int64)
+        day = np.asarray(local.year, dtype=np.int64) * 10000 + np.asarray(local.month) * 100 + np.asarray(local.day)
+        # Input is time-sorted, so session ids only ever step up
+        newSession = np.concatenate(([True], day[1:] != day[:-1])) if rows else np.zeros(0, dtype=bool)
+        self.session = np.cumsum(newSession) - 1
+        self.phase = np.where(clock < self.openMinute, PRE, np.where(clock < self.closeMinute, REGULAR, POST))
+        self.phase = self.phase.astype(np.int8)
+        self.minuteOfSession = clock - self.openMinute
+        self.sessions = int(newSession.sum())
+
+        self.firstRow = np.flatnonzero(newSession)
+        self.lastRow = np.concatenate((self.firstRow[1:] - 1, [rows - 1])) if rows else self.firstRow
+        regular = np.flatnonzero(self.phase == REGULAR)
+        self.regularOpenRow = np.full(self.sessions, rows, dtype=np.int64)
+        np.minimum.at(self.regularOpenRow, self.session[regular], regular)
+        self.regularOpenRow[self.regularOpenRow == rows] = -1
+        self.regularCloseRow = np.full(self.sessions, -1, dtype=np.int64)
+        np.maximum.at(self.regularCloseRow, self.session[regular], regular)
+        # Latest regular close of any earlier session; close rows only grow, so a running max skips gaps
+        self.previousCloseRow = np.maximum.accumulate(np.concatenate(([-1], self.regularCloseRow[:-1])))
+        self.intraday = rows > 1 and self.sessions < rows
+
+    def isRegular(self, row):
+        return self.phase[row] == REGULAR
+
+    def sessionOpenRow(self, row):
+        """Row of the first regular bar of row's session, or -1 if it hasn't printed yet"""
+        openRow = self.regularOpenRow[self.session[row]]
+        return openRow if 0 <= openRow <= row else -1
+
+    def priorCloseRow(self, row):
+        """Row of the previous session's last regular bar, or -1 for the first session"""
+        return self.previousCloseRow[self.session[row]]
+
+    def minutesToClose(self, row):
+        """Minutes left until the regular close (negative in the post-market)"""
+        return self.closeMinute - self.openMinute - self.minuteOfSession[row]
+
+    def openingRange(self, highs, lows, minutes):
+        """
+        Running (high, low) over each session's first `minutes` of regular trading, per bar
+
+        A bar only sees range bars at or before itself, so values are NaN until the first regular
+        bar and keep widening until the range is complete.
+        """
+        inRange = (self.phase == REGULAR) & (self.minuteOfSession < minutes)
+        grouped = pd.DataFrame({"high": np.where(inRange, highs, -np.inf),
+                                "low": np.where(inRange, lows, np.inf)}).groupby(self.session)
+        high = grouped["high"].cummax().to_numpy()
+        low = grouped["low"].cummin().to_numpy()
+        return np.where(np.isinf(high), np.nan, high), np.where(np.isinf(low), np.nan, low)
+
+    def atRow(self, values, sessionRows):
+        """values at a per-session row (e.g. previousCloseRow) spread over every bar; NaN where -1"""
+        rows = sessionRows[self.session]
+        return np.where(rows >= 0, np.asarray(values, dtype=np.float64)[np.maximum(rows, 0)], np.nan)
+
+    def toFrame(self, index=None):
+        return pd.DataFrame({
+            "session": self.session,
+            "phase": PHASE_LABELS[self.phase],
+            "minuteOfSession": self.minuteOfSession,
+            "sessionOpenRow": self.regularOpenRow[self.session],
+            "priorCloseRow": self.previousCloseRow[self.session],
+        }, index=index)
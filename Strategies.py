@@ -0,0 +1,87 @@
+import importlib
+
+# (module, class) for every strategy BatchTest.py imports, in the same order
+BATCH_STRATEGIES = [
+    ("Close", "Close"),
+    ("SMACross", "SMA_Cross"),
+    ("RSI_Strategy", "RSI_Strategy"),
+    ("Alpha1", "Alpha1"),
+    ("EMACross", "EMA_Cross"),
+    ("AI1", "CryptoAI"),
+    ("MeanReversion", "MeanReversion"),
+    ("AdaptiveSpreadStrategy", "AdaptiveSpreadStrategy"),
+    ("BasketTrading", "BasketTrading"),
+    ("VWAPDrift", "VWAPDrift"),
+    ("LatencyArbitrage", "LatencyArbitrage"),
+    ("OptionSkewArbitrage", "OptionSkewArbitrage"),
+    ("ADRLocalSharesArb", "ADRLocalSharesArb"),
+    ("BidAskSpreadCapture", "BidAskSpreadCapture"),
+    ("CalendarSpread", "CalendarSpread"),
+    ("ClosingAuctionMomentum", "ClosingAuctionMomentum"),
+    ("CointegrationTrading", "CointegrationTrading"),
+    ("DividendArbitrage", "DividendArbitrage"),
+    ("ETFConstituentArb", "ETFConstituentArb"),
+    ("ETFFuturesArb", "ETFFuturesArb"),
+    ("FadingLargeOrders", "FadingLargeOrders"),
+    ("FlashEventResponse", "FlashEventResponse"),
+    ("FuturesSpotArb", "FuturesSpotArb"),
+    ("HiddenMarkovModels", "HiddenMarkovModels"),
+    ("IcebergDetection", "IcebergDetection"),
+    ("LiquidityDetection", "LiquidityDetection"),
+    ("MeanReversionSpreads", "MeanReversionSpreads"),
+    ("OpeningRangeBreakout", "OpeningRangeBreakout"),
+    ("OrderBookFeatureModels", "OrderBookFeatureModels"),
+    ("OrderBookImbalance", "OrderBookImbalance"),
+    ("OrderFlowMomentum", "OrderFlowMomentum"),
+    ("PairsTrading", "PairsTrading"),
+    ("PeggedOrders", "PeggedOrders"),
+    ("PricePredictionML", "PricePredictionML"),
+    ("QueuePositioning", "QueuePositioning"),
+    ("ReinforcementLearningExecution", "ReinforcementLearningExecution"),
+    ("ShortTermMomentum", "ShortTermMomentum"),
+    ("TriangularArbitrage", "TriangularArbitrage"),
+    ("VolatilityExpansion", "VolatilityExpansion"),
+    ("LiquidityWavefrontScanning", "LiquidityWavefrontScanning"),
+    ("SpectralFractualStrategy", "IntradayFractalStrategy"),
+    ("QuantumEntropyStrategy", "QuantumEntropyStrategy"),
+    ("SuperiorAdaptiveSpreadStrategy", "SuperiorAdaptiveSpreadStrategy"),
+]
+
+
+def load(entries=None, names=None):
+    """
+    Import strategy classes, skipping any whose module or its dependencies are not installed
+
+    entries: (module, class) pairs, BATCH_STRATEGIES by default
+    names: Optional class names to restrict to
+    Returns (classes, skipped) where skipped maps class name to the import error
+    """
+    classes = []
+    skipped = {}
+    for module, name in entries if entries is not None else BATCH_STRATEGIES:
+        if names is not None and name not in names:
+            continue
+        try:
+            classes.append(getattr(importlib.import_module(module), name))
+        except (ImportError, AttributeError) as e:
+            skipped[name] = e
+    return classes, skipped
+
+
+def resolve(names):
+    """
+    Strategy classes for command-line names
+
+    Accepts a class or module name from BATCH_STRATEGIES, "all" for every importable one, or
+    "Module:Class" for strategies outside the list. Unknown or unimportable names raise.
+    """
+    if list(names) == ["all"]:
+        return load()
+    classes = []
+    for name in names:
+        module, _, attribute = name.partition(":")
+        if not attribute:
+            entry = next((e for e in BATCH_STRATEGIES if name in e), (module, module))
+            module, attribute = entry
+        classes.append(getattr(importlib.import_module(module), attribute))
+    return classes, {}
@@ -152,14 +152,21 @@ class SuperiorAdaptiveSpreadStrategy:
     def _check_order_imbalance(self, side="buy"):
         """Check order book imbalance condition"""
         try:
-            bid_size = float(self.dataScraper.getDateData(self.date, "BidSize"))
-            ask_size = float(self.dataScraper.getDateData(self.date, "AskSize"))
-            total_size = bid_size + ask_size
+            book = getattr(self.dataScraper, "book", None)
+            if book is not None:
+                # Imbalance over every recorded level, not just the touch
+                imbalance = book.imbalance()[self.dataScraper.getRow(self.date)]
+                if np.isnan(imbalance):
+                    return False
+            else:
+                bid_size = float(self.dataScraper.getDateData(self.date, "BidSize"))
+                ask_size = float(self.dataScraper.getDateData(self.date, "AskSize"))
+                total_size = bid_size + ask_size
 
-            if total_size == 0:
-                return False
+                if total_size == 0:
+                    return False
 
-            imbalance = (bid_size - ask_size) / total_size
+                imbalance = (bid_size - ask_size) / total_size
 
             if side == "buy":
                 return imbalance > self.imb_threshold
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from DataScraping import DataScraping
+
+SESSION_BARS = 390
+SESSION_OPEN = "13:30"
+MODELS = ("gbm", "jump", "regime")
+MINUTE_NS = 60 * 10 ** 9
+
+
+def minuteIndex(bars, start="2025-07-21", sessionOpen=SESSION_OPEN, sessionBars=SESSION_BARS):
+    """UTC minute timestamps over consecutive weekday sessions, built with integer arithmetic"""
+    days = pd.bdate_range(start, periods=bars // sessionBars + 1, tz="UTC") + pd.Timedelta(sessionOpen + ":00")
+    days = (days.as_unit("ns") if hasattr(days, "as_unit") else days).asi8
+    minute = np.arange(bars, dtype=np.int64)
+    nanos = days[minute // sessionBars] + (minute % sessionBars) * MINUTE_NS
+    return pd.DatetimeIndex(nanos.view("datetime64[ns]"), name="Date").tz_localize("UTC")
+
+
+def _regimes(rng, bars, persistence):
+    """Two-state Markov chain (0 = calm, 1 = volatile) drawn as alternating geometric run lengths"""
+    runs = rng.geometric(1 - np.asarray(persistence), size=(bars // 2 + 1, 2)).ravel()
+    runs = runs[:np.searchsorted(np.cumsum(runs), bars) + 1]
+    states = np.tile([0, 1], len(runs) // 2 + 1)[:len(runs)]
+    if rng.random() < .5:
+        states = 1 - states
+    return np.repeat(states, runs)[:bars]
+
+
+def logReturns(rng, bars, model="gbm", drift=0.0, volatility=.001, jumpRate=.002, jumpSize=.01,
+               regimeVolatility=(.0006, .002), regimePersistence=(.999, .995)):
+    """
+    Per-bar log returns and per-bar volatility
+
+    gbm: normal returns with constant volatility
+    jump: gbm plus Poisson jumps (jumpRate per bar) with normal sizes of standard deviation jumpSize
+    regime: volatility switches between regimeVolatility[0] and [1] with the given stay probabilities
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown price model {model!r}, expected one of {MODELS}")
+    sigma = np.full(bars, float(volatility))
+    if model == "regime":
+        sigma = np.asarray(regimeVolatility, dtype=np.float64)[_regimes(rng, bars, regimePersistence)]
+    returns = drift - sigma ** 2 / 2 + sigma * rng.standard_normal(bars)
+    if model == "jump":
+        jumps = rng.poisson(jumpRate, bars)
+        hit = np.flatnonzero(jumps)
+        returns[hit] += jumpSize * np.sqrt(jumps[hit]) * rng.standard_normal(len(hit))
+    return returns, sigma
+
+
+def volumeCurve(bars, sessionBars=SESSION_BARS, base=50000.0, edge=3.0):
+    """Intraday U-shape: edge times the midday volume at the open and close"""
+    position = (np.arange(bars) % sessionBars) / (sessionBars - 1) * 2 - 1
+    return base * (1 + (edge - 1) * position ** 2)
+
+
+def generate(bars, seed=0, model="gbm", price=100.0, start="2025-07-21", sessionBars=SESSION_BARS,
+             overnightVolatility=.005, volume=50000.0, quotes=False, vwap=False, **modelParams):
+    """
+    Synthetic minute bars in the DataScraping column layout, fully vectorized
+
+    Parameters:
+    bars: Number of rows
+    seed: Seed for numpy's Generator; the same arguments always give the same frame
+    model: "gbm", "jump" or "regime" (see logReturns for modelParams)
+    price: First open
+    overnightVolatility: Standard deviation of the log gap at each session's first bar
+    volume: Midday mean volume; activity also rises with the size of the bar's move
+    quotes: Add Bid/Ask/BidSize/AskSize columns
+    vwap: Add a VWAP column that resets every session
+    """
+    rng = np.random.default_rng(seed)
+    returns, sigma = logReturns(rng, bars, model, **modelParams)
+    sessionStart = np.arange(bars) % sessionBars == 0
+    gaps = np.where(sessionStart, overnightVolatility * rng.standard_normal(bars), 0.0)
+    gaps[0] = 0.0
+    # Open sits a gap away from the previous close; the bar then moves returns from the open
+    logOpen = np.log(price) + np.cumsum(gaps + np.concatenate(([0.0], returns[:-1])))
+    logClose = logOpen + returns
+    # Brownian-bridge extremes between open and close, so High >= max(Open, Close) and Low <= min
+    spread = np.sqrt(returns ** 2 - 2 * sigma ** 2 * np.log(rng.random((2, bars))))
+    high = np.exp(logOpen + (returns + spread[0]) / 2)
+    low = np.exp(logOpen + (returns - spread[1]) / 2)
+    open, close = np.exp(logOpen), np.exp(logClose)
+
+    activity = volumeCurve(bars, sessionBars, volume) * (1 + np.abs(returns) / sigma.mean()) / 2
+    shares = np.maximum(1, np.round(activity * rng.lognormal(-.125, .5, bars)))
+
+    change = 100 * np.concatenate(([0.0], close[1:] / close[:-1] - 1))
+    data = pd.DataFrame({
+        "Open": open,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "% Change": change,
+        "% Change vs Average": change - np.cumsum(change) / np.arange(1, bars + 1),
+        "Volume": shares,
+    }, index=minuteIndex(bars, start, sessionBars=sessionBars))
+
+    if quotes:
+        halfSpread = close * np.maximum(sigma / 4, 1e-4)
+        data["Bid"] = close - halfSpread
+        data["Ask"] = close + halfSpread
+        data["BidSize"] = np.round(rng.lognormal(5, 1, bars))
+        data["AskSize"] = np.round(rng.lognormal(5, 1, bars))
+    if vwap:
+        notional = np.cumsum((high + low + close) / 3 * shares)
+        total = np.cumsum(shares)
+        # Subtract the running totals as of each session's first bar to reset daily
+        before = np.arange(bars) // sessionBars * sessionBars - 1
+        notional -= np.where(before >= 0, notional[np.maximum(before, 0)], 0)
+        total -= np.where(before >= 0, total[np.maximum(before, 0)], 0)
+        data["VWAP"] = notional / total
+    return data
+
+
+def scraper(bars, seed=0, **params):
+    """generate() wrapped as a DataScraping, ready for BackTesting"""
+    return DataScraping.fromData(generate(bars, seed, **params))
+
+
+def toCsv(data, path):
+    """Write in the bundled CSVs' schema (ISO UTC dates, quoted fields) so DataScraping(path) reads it back"""
+    frame = data.copy()
+    dates = frame.index.tz_convert("UTC") if frame.index.tz is not None else frame.index
+    frame.index = dates.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    frame.index.name = "Date"
+    frame.to_csv(path, float_format="%.4f", quoting=1)
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    for model in MODELS:
+        begin = time.perf_counter()
+        data = generate(10_000_000, seed=1, model=model, quotes=True, vwap=True)
+        print(f"{model}: {len(data)} bars in {time.perf_counter() - begin:.2f}s")
+    print(data.tail())
+    path = os.path.join(tempfile.mkdtemp(), "SyntheticRegime.csv")
+    toCsv(generate(2000, seed=1, model="regime"), path)
+    DataScraping(path).printData()
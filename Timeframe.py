@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# How each column collapses into a coarse bar; anything else keeps the bucket's last value
+AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+class Timeframe:
+    def __init__(self, data, freq, timezone="America/New_York"):
+        """
+        Coarse OHLCV bars built from base bars, plus a look-ahead-free map back to the base rows
+
+        Buckets are floored in the exchange's timezone so "D" means a trading calendar day and
+        "15min" buckets line up with the 09:30 open. A coarse bar only becomes visible on the base
+        bar that finishes it (timestamp + base bar length reaches the bucket's end); until then a
+        base bar maps to the previous coarse bar. Missing minutes at the end of a bucket just delay
+        it to the next base bar.
+
+        bars: DataFrame of coarse bars indexed by bucket start
+        latest: latest[row] is the coarse row completed as of base row, -1 before the first one
+        """
+        self.freq = freq
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        local = index.tz_convert(timezone)
+        rows = len(index)
+
+        starts = local.floor(freq) if freq.upper() != "D" else local.normalize()
+        newBucket = np.ones(rows, dtype=bool)
+        newBucket[1:] = starts[1:] != starts[:-1]
+        boundaries = np.flatnonzero(newBucket)
+        ends = np.concatenate((boundaries[1:] - 1, [rows - 1])) if rows else boundaries
+        bucket = np.cumsum(newBucket) - 1
+
+        columns = {}
+        for column in data.columns:
+            if not pd.api.types.is_numeric_dtype(data[column]):
+                continue
+            values = data[column].to_numpy(dtype=np.float64)
+            how = AGGREGATIONS.get(column, "last")
+            if rows == 0:
+                columns[column] = values
+            elif how == "first":
+                columns[column] = values[boundaries]
+            elif how == "max":
+                columns[column] = np.maximum.reduceat(values, boundaries)
+            elif how == "min":
+                columns[column] = np.minimum.reduceat(values, boundaries)
+            elif how == "sum":
+                columns[column] = np.add.reduceat(values, boundaries)
+            else:
+                columns[column] = values[ends]
+        self.columns = columns
+        self.bars = pd.DataFrame(columns, index=pd.DatetimeIndex(starts[boundaries], name="Date"))
+
+        if freq.upper() == "D":
+            bucketEnd = (starts[boundaries] + pd.DateOffset(days=1)).tz_convert("UTC")
+        else:
+            bucketEnd = (starts[boundaries] + pd.tseries.frequencies.to_offset(freq)).tz_convert("UTC")
+        spacing = pd.Series(index).diff().median() if rows > 1 else pd.Timedelta(0)
+        complete = (index + spacing) >= bucketEnd[bucket]
+        self.latest = bucket - (~np.asarray(complete)).astype(np.int64)
+
+    def row(self, baseRow):
+        """Coarse row completed as of baseRow, or -1"""
+        return self.latest[baseRow]
+
+    def value(self, baseRow, type, lag=0):
+        """type of the coarse bar lag bars before the latest completed one (NaN if there isn't one)"""
+        row = self.latest[baseRow] - lag
+        return self.columns[type][row] if row >= 0 else np.nan
+
+    def history(self, baseRow, type, count):
+        """The last count completed coarse values of type as of baseRow, oldest first (may be shorter)"""
+        end = self.latest[baseRow] + 1
+        return self.columns[type][max(0, end - count):end]
@@ -0,0 +1,181 @@
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+class Feed:
+    def __init__(self, name, times, prices):
+        """One venue's price updates: int64 nanosecond timestamps (sorted) and the price from then on"""
+        self.name = name
+        self.times = np.asarray(times, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        if len(self.times) != len(self.prices):
+            raise ValueError("times and prices must be the same length")
+        if (np.diff(self.times) < 0).any():
+            order = np.argsort(self.times, kind="stable")
+            self.times, self.prices = self.times[order], self.prices[order]
+
+    @classmethod
+    def fromData(cls, name, data, column="Close"):
+        """A feed from a Date-indexed frame such as DataScraping(csv).data"""
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        times = (index.as_unit("ns") if hasattr(index, "as_unit") else index).asi8
+        prices = data[column].to_numpy(dtype=np.float64)
+        keep = ~np.isnan(prices)
+        return cls(name, times[keep], prices[keep])
+
+    def delayed(self, name, delay, jitter=0, seed=None):
+        """
+        A synthetic venue that publishes the same prices delay ns later, plus exponential jitter
+        with mean jitter ns; updates still arrive in order, so a late one holds back the ones after
+        """
+        times = self.times + int(delay)
+        if jitter:
+            times = times + np.random.default_rng(seed).exponential(jitter, len(times)).astype(np.int64)
+        return Feed(name, np.maximum.accumulate(times), self.prices)
+
+    def priceAt(self, times):
+        """Price in force at each time (NaN before the first update)"""
+        position = np.searchsorted(self.times, times, side="right") - 1
+        return np.where(position >= 0, self.prices[np.maximum(position, 0)], np.nan)
+
+    def __len__(self):
+        return len(self.times)
+
+
+def merge(feeds):
+    """All feeds' updates as (time, venue, price) in time order; a heap-based k-way merge, ties by venue"""
+    streams = [zip(feed.times.tolist(), itertools.repeat(venue), feed.prices.tolist())
+               for venue, feed in enumerate(feeds)]
+    return heapq.merge(*streams)
+
+
+def signals(feeds, strategy):
+    """
+    Replay the merged feeds through strategy.venue_signal(fast_price, slow_price)
+
+    Every update makes its venue the fast one and is checked against the last price seen from
+    each other venue; the most divergent venue that signals gets an order. Each stale quote is
+    only traded once, so a lagging venue is hit again only after it updates. Returns one row per
+    order: the update's time, the fast and target venues, side and the prices that were seen.
+    """
+    count = len(feeds)
+    seen = [np.nan] * count
+    version = [0] * count
+    traded = [-1] * count
+    rows = []
+    for time, venue, price in merge(feeds):
+        seen[venue] = price
+        version[venue] += 1
+        best, target, side = 0.0, -1, 0
+        for other in range(count):
+            if other == venue or traded[other] == version[other] or seen[other] != seen[other]:
+                continue
+            signal = strategy.venue_signal(price, seen[other])
+            gap = abs(price - seen[other])
+            if signal and gap > best:
+                best, target, side = gap, other, signal
+        if target >= 0:
+            traded[target] = version[target]
+            rows.append((time, venue, target, side, price, seen[target]))
+    return pd.DataFrame(rows, columns=["time", "fast", "venue", "side", "fastPrice", "seenPrice"])
+
+
+def fill(orders, feeds, latency=0, orderLatency=None, jitter=0, seed=None):
+    """
+    Price the orders from signals() for a trader latency ns behind the feeds
+
+    The trader sees each update latency ns late and its order takes orderLatency ns (default:
+    latency) to reach the venue, plus exponential jitter with mean jitter ns. The order fills at
+    the target venue's price when it arrives; its edge is the fast venue's price at that moment
+    minus the fill, in the order's direction. expectedEdge is what the prices seen at the signal
+    promised.
+    """
+    orderLatency = latency if orderLatency is None else orderLatency
+    arrival = orders["time"].to_numpy() + int(latency) + int(orderLatency)
+    if jitter:
+        arrival = arrival + np.random.default_rng(seed).exponential(jitter, len(arrival)).astype(np.int64)
+    fillPrice = np.full(len(orders), np.nan)
+    fairPrice = np.full(len(orders), np.nan)
+    for venue, feed in enumerate(feeds):
+        target = orders["venue"].to_numpy() == venue
+        fillPrice[target] = feed.priceAt(arrival[target])
+        fast = orders["fast"].to_numpy() == venue
+        fairPrice[fast] = feed.priceAt(arrival[fast])
+    side = orders["side"].to_numpy()
+    trades = orders.copy()
+    trades["arrival"] = arrival
+    trades["fillPrice"] = fillPrice
+    trades["edge"] = side * (fairPrice - fillPrice)
+    trades["expectedEdge"] = side * (orders["fastPrice"].to_numpy() - orders["seenPrice"].to_numpy())
+    return trades
+
+
+def summarize(trades):
+    if len(trades) == 0:
+        return {"trades": 0, "hitRate": np.nan, "meanEdgeBps": np.nan, "totalEdge": 0.0, "captured": np.nan}
+    expected = trades["expectedEdge"].sum()
+    return {
+        "trades": len(trades),
+        "hitRate": (trades["edge"] > 0).mean(),
+        "meanEdgeBps": (trades["edge"] / trades["fillPrice"]).mean() * 1e4,
+        "totalEdge": trades["edge"].sum(),
+        "captured": trades["edge"].sum() / expected if expected else np.nan,
+    }
+
+
+def latencySweep(feeds, strategy, latencies, orderLatency=None, jitter=0, seed=0):
+    """
+    Edge left at each trader latency (ns); captured is the share of the edge visible at the signal
+
+    The strategy's decisions don't depend on its own latency (every update reaches it equally
+    late), so the merge runs once and each latency only re-prices the fills.
+    """
+    orders = signals(feeds, strategy)
+    rows = []
+    for latency in latencies:
+        trades = fill(orders, feeds, latency, orderLatency, jitter, seed)
+        rows.append(dict(latencyUs=latency / 1e3, **summarize(trades)))
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from DataScraping import DataScraping
+    from LatencyArbitrage import LatencyArbitrage
+
+    parser = argparse.ArgumentParser(description="How much latency-arbitrage edge survives own latency")
+    parser.add_argument("--data", nargs="*", help="One CSV per venue; with one, --delay/--jitter venues are added")
+    parser.add_argument("--ticks", type=int, default=1_000_000, help="Synthetic primary updates when no --data")
+    parser.add_argument("--delay", type=float, nargs="+", default=[1.0, 3.0], help="Synthetic venue delays, ms")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Mean venue jitter, ms")
+    parser.add_argument("--threshold", type=float, default=0.00005)
+    parser.add_argument("--latency", type=float, nargs="+", default=[0, 50, 250, 500, 1000, 2000, 5000],
+                        help="Own latencies to test, microseconds")
+    args = parser.parse_args()
+
+    if args.data:
+        feeds = [Feed.fromData(path, DataScraping(path).data) for path in args.data]
+    else:
+        # A tick-level random walk: updates every 2 ms on average, moves of 1 cent
+        rng = np.random.default_rng(7)
+        times = 1_753_450_000_000_000_000 + np.cumsum(rng.exponential(2e6, args.ticks)).astype(np.int64)
+        prices = 100 + np.cumsum(rng.choice([-0.01, 0.0, 0.01], args.ticks, p=[0.3, 0.4, 0.3]))
+        feeds = [Feed("primary", times, prices)]
+    if len(feeds) == 1:
+        feeds += [feeds[0].delayed(f"venue+{delay:g}ms", delay * 1e6, args.jitter * 1e6, seed=k)
+                  for k, delay in enumerate(args.delay)]
+
+    strategy = LatencyArbitrage(None, None, price_diff_threshold=args.threshold)
+    events = sum(len(feed) for feed in feeds)
+    begin = time.perf_counter()
+    table = latencySweep(feeds, strategy, [latency * 1e3 for latency in args.latency])
+    elapsed = time.perf_counter() - begin
+    print(f"{events:,} updates from {len(feeds)} venues merged and priced in {elapsed:.2f}s "
+          f"({events / elapsed:,.0f} updates/s)")
+    print(table.to_string(index=False, float_format="%.4f"))
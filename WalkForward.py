@@ -0,0 +1,180 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from DataScraping import DataScraping
+from Optimizer import Optimizer, SharedData, evaluate, workerData, workerPool
+
+
+def runFold(dataScraper, fold, strategyClass, candidates, metric, amount, halving):
+    """Optimise on the fold's train rows, then score the winner on its test rows"""
+    trainStart, trainEnd, testEnd = fold
+    trainScraper = DataScraping.fromData(dataScraper.data.iloc[trainStart:trainEnd])
+    table = Optimizer(strategyClass, trainScraper, metric, amount, workers=1).search(candidates, halving)
+    best = table.iloc[0]
+    params = best["params"]
+
+    # The test run keeps the train rows in front of it so lookback windows are already warm
+    testScraper = DataScraping.fromData(dataScraper.data.iloc[trainStart:testEnd])
+    test = evaluate(testScraper, strategyClass, params, testEnd - trainStart, amount, start=trainEnd - trainStart)
+    return {
+        "params": params,
+        "train": {name: _plain(best[name]) for name in test if name in best},
+        "test": test,
+    }
+
+
+def _runFoldInWorker(fold, strategyClass, candidates, metric, amount, halving):
+    return runFold(workerData(), fold, strategyClass, candidates, metric, amount, halving)
+
+
+def _plain(value):
+    # numpy scalars (e.g. int64 from the ranked table) are not json serialisable
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class WalkForward:
+    def __init__(self, strategyClass, dataScraper, candidates, trainBars, testBars, step=None,
+                 anchored=False, metric="sharpe", amount=1000, halving=False, workers=None,
+                 cacheDir=".walkforward_cache"):
+        """
+        Rolling out-of-sample validation
+
+        Parameters:
+        strategyClass: Strategy to tune
+        dataScraper: Dataset, e.g. DataScraping.fromFiles([...]) for several per-ticker CSVs
+        candidates: Parameter dicts to search, e.g. Optimizer.grid(space)
+        trainBars: Rows optimised over in each fold
+        testBars: Rows evaluated out of sample after each train window
+        step: Rows between fold starts (defaults to testBars so test windows tile the data)
+        anchored: Grow the train window from row 0 instead of rolling it forward
+        halving: Use successive halving inside each train window
+        workers: Folds run concurrently in this many processes
+        cacheDir: Per-fold results are stored here keyed by the fold's data and settings
+        """
+        self.strategyClass = strategyClass
+        self.dataScraper = dataScraper
+        self.candidates = candidates
+        self.trainBars = trainBars
+        self.testBars = testBars
+        self.step = step if step is not None else testBars
+        self.anchored = anchored
+        self.metric = metric
+        self.amount = amount
+        self.halving = halving
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.cacheDir = cacheDir
+
+    def folds(self):
+        """(trainStart, trainEnd, testEnd) row offsets for every complete fold"""
+        rows = len(self.dataScraper.data)
+        folds = []
+        start = 0
+        while start + self.trainBars + self.testBars <= rows:
+            trainStart = 0 if self.anchored else start
+            folds.append((trainStart, start + self.trainBars, start + self.trainBars + self.testBars))
+            start += self.step
+        return folds
+
+    def foldKey(self, fold):
+        """Hash of everything that determines a fold's result"""
+        trainStart, _, testEnd = fold
+        data = self.dataScraper.data.iloc[trainStart:testEnd]
+        digest = hashlib.sha1()
+        digest.update(data.index.asi8.tobytes())
+        digest.update(np.ascontiguousarray(data.select_dtypes("number").to_numpy(dtype=np.float64)).tobytes())
+        digest.update(json.dumps({
+            "strategy": f"{self.strategyClass.__module__}.{self.strategyClass.__qualname__}",
+            "candidates": self.candidates,
+            "fold": [f - trainStart for f in fold],
+            "metric": self.metric,
+            "amount": self.amount,
+            "halving": self.halving,
+        }, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _cachePath(self, key):
+        return os.path.join(self.cacheDir, key + ".json")
+
+    def _loadCached(self, key):
+        path = self._cachePath(key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _store(self, key, result):
+        os.makedirs(self.cacheDir, exist_ok=True)
+        tmp = self._cachePath(key) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(result, f, default=_plain)
+        os.replace(tmp, self._cachePath(key))
+
+    def run(self):
+        """Run every fold, reusing cached folds, and return one row per fold"""
+        folds = self.folds()
+        keys = [self.foldKey(fold) for fold in folds]
+        results = {}
+        pending = []
+        for fold, key in zip(folds, keys):
+            cached = self._loadCached(key) if self.cacheDir else None
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending.append((fold, key))
+
+        if pending:
+            computed = self._compute([fold for fold, _ in pending])
+            for (fold, key), result in zip(pending, computed):
+                results[key] = result
+                if self.cacheDir:
+                    self._store(key, result)
+
+        rows = []
+        index = self.dataScraper.data.index
+        for number, (fold, key) in enumerate(zip(folds, keys)):
+            trainStart, trainEnd, testEnd = fold
+            result = results[key]
+            row = {
+                "fold": number,
+                "trainStart": index[trainStart],
+                "testStart": index[trainEnd],
+                "testEnd": index[testEnd - 1],
+            }
+            row.update(result["params"])
+            row.update({"train " + k: v for k, v in result["train"].items()})
+            row.update({"test " + k: v for k, v in result["test"].items()})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def _compute(self, folds):
+        args = (self.strategyClass, self.candidates, self.metric, self.amount, self.halving)
+        if self.workers <= 1 or len(folds) == 1:
+            return [runFold(self.dataScraper, fold, *args) for fold in folds]
+
+        shared = SharedData(self.dataScraper)
+        try:
+            with workerPool(shared.spec(), min(self.workers, len(folds))) as pool:
+                futures = [pool.submit(_runFoldInWorker, fold, *args) for fold in folds]
+                return [future.result() for future in futures]
+        finally:
+            shared.close()
+
+
+if __name__ == "__main__":
+    import sys
+    from RSI_Strategy import RSI_Strategy
+
+    # Pass CSV paths as arguments to validate over their concatenation
+    dataScraper = DataScraping.fromFiles(sys.argv[1:] or ["SPY2.csv"])
+    candidates = Optimizer.grid({
+        "window": [7, 14, 21],
+        "buy_threshold": [25, 30, 35],
+        "sell_threshold": [65, 70, 75],
+    })
+    walkForward = WalkForward(RSI_Strategy, dataScraper, candidates, trainBars=600, testBars=200)
+    pd.set_option('display.max_columns', None)
+    print(walkForward.run().to_string(float_format='%.4f'))